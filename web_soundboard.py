@@ -6,7 +6,7 @@ Raspberry Pi Web-Soundboard + Live-Mikro mit Stimmenverzerrer (SoX)
 Features
 - MP3-Soundboard mit Suche (schöne Liste)
 - Output über ALSA / mpg123 (wählbares Gerät, z. B. plughw:1,0)
-- Servo-Lippenbewegung (pigpio) anhand Hüllkurve aus MP3
+- Servo-Lippenbewegung (pigpio) anhand Hüllkurve aus MP3 (mpg123-Decode → NumPy)
 - Optional Power/LED-GPIO (an beim Start, aus nach Ende)
 - Lautstärkeregelung via amixer (Mixer auto-erkennung)
 - Live-Mikrofon:
@@ -18,7 +18,13 @@ Features
 
 Voraussetzungen
   sudo apt-get install -y mpg123 alsa-utils sox libsox-fmt-alsa
-  pip3 install flask numpy pydub sounddevice pigpio
+  pip3 install flask numpy sounddevice pigpio
+  optional: pip3 install pyalsaaudio   (Mixer ohne amixer-Aufrufe)
+  optional: pip3 install numba         (schnellere Hüllkurven-Glättung)
+  optional: pip3 install numpy-rms     (SIMD-RMS im Live-Audio-Callback)
+  optional: pip3 install orjson        (schnelleres Lesen/Schreiben der Config)
+  optional: pip3 install watchdog      (MP3-Liste ohne Verzeichnis-Scan je Anfrage)
+  optional: pip3 install waitress      (mehrthreadiger WSGI-Server statt Flask-Dev-Server)
   sudo systemctl enable --now pigpio
 
 Start
@@ -26,15 +32,18 @@ Start
   Browser: http://<Pi-IP>:8080
 """
 
-import os, sys, re, json, shlex, signal, subprocess, threading, time, argparse, copy
+import os, sys, re, json, shlex, signal, subprocess, threading, time, queue, argparse, copy, atexit, importlib.util, mmap, struct, hashlib, gzip, ctypes, ctypes.util
 from collections import deque
+from itertools import islice
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from flask import Flask, request, jsonify, render_template_string, abort, send_file
+from flask import Flask, Response, request, jsonify, abort, send_file, stream_with_context
 from werkzeug.utils import secure_filename
+from urllib.parse import quote
 
 import numpy as np
-from pydub import AudioSegment
 
 # pigpio optional
 try:
@@ -43,22 +52,84 @@ try:
 except Exception:
     HAVE_PIGPIO = False
 
-# sounddevice optional (für Live)
+# numba optional (Hüllkurven-Glättung nativ statt im Interpreter)
 try:
-    import sounddevice as sd
-    HAVE_SD = True
+    import numba
+    HAVE_NUMBA = True
 except Exception:
-    HAVE_SD = False
+    HAVE_NUMBA = False
+
+# numpy-rms optional (RMS per SIMD ohne Zwischen-Array im Live-Callback)
+try:
+    import numpy_rms
+    HAVE_NUMPY_RMS = True
+except Exception:
+    HAVE_NUMPY_RMS = False
+
+# pyalsaaudio optional (Mixer direkt über die ALSA-API statt amixer-Subprozess)
+try:
+    import alsaaudio
+    HAVE_ALSAAUDIO = True
+except Exception:
+    HAVE_ALSAAUDIO = False
+
+# orjson optional (schnelleres JSON für Config und Metadaten-Cache)
+try:
+    import orjson
+    HAVE_ORJSON = True
+except Exception:
+    HAVE_ORJSON = False
+
+# watchdog optional (MP3-Verzeichnis nur bei Änderungen neu einlesen)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAVE_WATCHDOG = True
+except Exception:
+    HAVE_WATCHDOG = False
+
+# waitress optional (WSGI-Server mit Thread-Pool; kein eventlet/gevent, da
+# pigpio und sounddevice blockierende C-Aufrufe machen)
+try:
+    from waitress import serve as waitress_serve
+    HAVE_WAITRESS = True
+except Exception:
+    HAVE_WAITRESS = False
+
+# sounddevice optional (für Live) – erst bei Bedarf importieren: der Import
+# initialisiert PortAudio samt Geräte-Scan und verzögert sonst den Start
+HAVE_SD = importlib.util.find_spec("sounddevice") is not None
+_sd_module = None
+
+def get_sd():
+    global _sd_module, HAVE_SD
+    if _sd_module is None:
+        try:
+            import sounddevice
+        except Exception as e:   # z. B. libportaudio fehlt
+            HAVE_SD = False
+            raise RuntimeError(f"sounddevice nicht verfügbar: {e}")
+        _sd_module = sounddevice
+    return _sd_module
 
 # =========================
 #   Konfiguration
 # =========================
 SOUND_DIR   = Path("/opt/MP3-Soundboard")
 CONFIG_PATH = Path("/opt/configs/web_soundboard_config.json")
+META_CACHE_PATH = Path("~/.cache/soundboard.meta.json").expanduser()
 HOST, PORT  = "0.0.0.0", 8080
+# Hinter nginx: Vorschau-Dateien per X-Accel-Redirect ausliefern lassen,
+# z. B. "/_sounds/" (siehe README); None = Flask sendet selbst
+X_ACCEL_PREFIX = None
 
 SERVO_US_MIN = 500
 SERVO_US_MAX = 2500
+# Servo-Pulse für vorberechnete Hüllkurven als pigpio-Waveform (DMA-getaktet)
+# statt eines set_servo_pulsewidth je Frame; Live und Streaming bleiben dabei
+SERVO_WAVE         = False
+SERVO_PERIOD_US    = 20000   # 50 Hz Servo-Raster
+SERVO_WAVE_PERIODS = 100     # Perioden je Wave-Block (2 s)
 
 # Envelope (MP3 → Servo)
 FRAME_MS          = 30
@@ -66,9 +137,27 @@ ATTACK_MS         = 40
 RELEASE_MS        = 120
 SILENCE_GATE_DBFS = -45
 NORM_PERCENTILE   = 95
+ENV_SAMPLERATE    = 8000    # mpg123 dekodiert dafür direkt mono mit dieser Rate (reicht für 30-ms-RMS)
+ENV_READ_FRAMES   = 256     # Frames pro Pipe-Read (ein NumPy-Aufruf je Block)
+ENV_STREAM_FRAMES = 16      # Frames pro Block beim Streamen (~0,5 s bei 30 ms)
+ENV_PREWARM_WORKERS = 2     # Hintergrund-Threads für die Vorberechnung beim Start
 
 # mpg123 Start-Wartezeit
 START_WAIT_MS     = 120
+# mpg123 dauerhaft im Remote-Modus (-R) halten statt je Sound neu zu starten
+MPG123_REMOTE     = True
+MPG123_STOP_WAIT_S = 0.5    # so lange auf die Bestätigung (@P 0) eines STOP warten
+
+# Zwischenspeicher für ALSA-Abfragen bzw. Gerätelisten (Sekunden)
+MIXER_CACHE_TTL   = 30
+DEVICE_CACHE_TTL  = 10
+
+# Live: SCHED_FIFO-Priorität des PortAudio-Callback-Threads
+LIVE_RT_PRIORITY  = 40
+LIVE_SERVO_MAX_HZ = 200   # Obergrenze für pigpio-Aufrufe im Live-Modus
+LIVE_SOX_QUEUE    = 8     # Blöcke zwischen Audio-Callback und SoX-Schreiber (Modus fx)
+LIVE_SOX_COALESCE_MS = 10 # so viel Audio je write() an SoX sammeln (kostet ebenso viel Latenz)
+LIVE_MLOCK        = False # opt-in: Speicher des Live-Prozesses sperren (siehe README; ~300 MB mit numba)
 
 DEFAULT_TITLE = "🎵 Raspberry Pi Soundboard"
 
@@ -90,6 +179,8 @@ DEFAULT_CONFIG = {
     "power_gpio": 23,     # None = deaktiviert
     "closed_angle": 5,
     "open_angle": 65,
+    "servo_deadband_us": 15,      # kleinere Pulsbreiten-Änderungen nicht senden
+    "servo_min_interval_ms": 15,  # höchstens ein pigpio-Aufruf je Intervall
 
     # MP3-Befehle
     "mp3_command_bindings": [],
@@ -137,8 +228,13 @@ pi = None
 servo_thread = {"t": None, "stop": None}
 
 # Live Mic Prozess (Subprozess = dieses Skript mit --live)
-live_proc = {"p": None, "mode": None, "args": None}
-live_log  = deque(maxlen=600)
+live_proc = {"p": None, "mode": None, "args": None, "starting": False, "stopping": False}
+LIVE_LOG_LINES = 600   # Ring für die Live-Ausgabe; die Live-Seite zeigt ebenso viele Zeilen
+live_log  = deque(maxlen=LIVE_LOG_LINES)
+# /live-events: n zählt alle je angehängten Zeilen, clears das Leeren des Logs,
+# epoch jeden Statuswechsel; live_cond weckt die wartenden Event-Streams
+live_cond = threading.Condition()
+live_seq  = {"n": 0, "clears": 0, "epoch": 0}
 
 def now_str(): return time.strftime("%Y-%m-%d %H:%M:%S")
 
@@ -202,12 +298,32 @@ def _apply_path_settings_from_cfg():
     else:
         cfg["config_path"] = str(CONFIG_PATH)
 
+def json_loads_bytes(data):
+    if HAVE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+def json_dumps_bytes(obj, indent=True):
+    if HAVE_ORJSON:
+        opt = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent: opt |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=opt)
+        except TypeError:
+            pass   # unbekannter Typ -> stdlib versuchen
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+def write_atomic(path: Path, data: bytes):
+    # Erst temporär schreiben, dann umbenennen: kein halbes File bei Absturz
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
 def load_config():
     global cfg, SOUND_DIR, CONFIG_PATH
     if CONFIG_PATH.exists():
         try:
-            with CONFIG_PATH.open("r", encoding="utf-8") as f:
-                cfg.update(json.load(f))
+            cfg.update(json_loads_bytes(CONFIG_PATH.read_bytes()))
         except Exception as e:
             set_last_error(f"Config lesen fehlgeschlagen ({CONFIG_PATH}): {e}")
     else:
@@ -222,13 +338,19 @@ def load_config():
     _apply_path_settings_from_cfg()
     ensure_dirs()
 
+# zuletzt geschriebene Bytes je Pfad: unveränderte Konfig nicht erneut auf die SD-Karte schreiben
+_last_saved = {"path": None, "data": None}
+
 def save_config():
     try:
-        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
         cfg["sound_dir"] = str(SOUND_DIR)
         cfg["config_path"] = str(CONFIG_PATH)
-        with CONFIG_PATH.open("w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2, ensure_ascii=False)
+        data = json_dumps_bytes(cfg)
+        if _last_saved["path"] == CONFIG_PATH and _last_saved["data"] == data and CONFIG_PATH.exists():
+            return
+        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(CONFIG_PATH, data)
+        _last_saved["path"], _last_saved["data"] = CONFIG_PATH, data
     except Exception as e:
         set_last_error(f"Config speichern fehlgeschlagen ({CONFIG_PATH}): {e}")
 
@@ -239,13 +361,14 @@ def _coerce_categories(value):
         value = list(value)
     elif not isinstance(value, list):
         value = []
-    result = []
+    result, seen = [], set()
     for cat in value:
         if not isinstance(cat, str):
             continue
         cat = cat.strip()
-        if not cat or cat in result:
+        if not cat or cat in seen:
             continue
+        seen.add(cat)
         result.append(cat)
     return result
 
@@ -336,19 +459,202 @@ def monitor_mp3_process(proc, filename):
     threading.Thread(target=_waiter, daemon=True).start()
 
 
+# ===== MP3-Metadaten-Cache =====
+# Schlüssel (Pfad, mtime_ns, Größe) – geänderte Dateien fallen automatisch heraus.
+_meta_cache = {}
+
+def _meta_key(path: Path):
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+def remember_mp3_meta(path: Path, env_frames, duration):
+    try:
+        key = _meta_key(path)
+    except OSError:
+        return
+    duration = float(duration)
+    _meta_cache[key] = {
+        "duration": round(duration, 3),
+        "env_frames": int(env_frames),
+        "bitrate_kbps": int(key[2] * 8 / duration / 1000) if duration > 0 else None,
+    }
+
+# MPEG-Audio Layer III: Bitraten (kbps) und Abtastraten je Version
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLERATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def mp3_header_info(path: Path):
+    """Dauer/Bitrate aus den Frame-Headern per mmap, ohne zu dekodieren.
+    VBR über Xing/Info- bzw. VBRI-Frameanzahl, sonst CBR aus der Dateigröße.
+    Gibt (dauer_s, kbps) oder None zurück."""
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < 128: return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            off = 0
+            if mm[:3] == b"ID3" and size >= 10:
+                b = mm[6:10]
+                off = 10 + ((b[0] & 0x7F) << 21 | (b[1] & 0x7F) << 14 | (b[2] & 0x7F) << 7 | (b[3] & 0x7F))
+                if mm[5] & 0x10: off += 10   # Footer
+            end = min(size - 4, off + 65536)
+            while off < end:
+                off = mm.find(b"\xff", off, end)
+                if off < 0: return None
+                (h,) = struct.unpack_from(">I", mm, off)
+                ver, layer = (h >> 19) & 3, (h >> 17) & 3
+                br_idx, sr_idx = (h >> 12) & 0xF, (h >> 10) & 3
+                if (h >> 21) & 0x7FF == 0x7FF and ver != 1 and layer == 1 and 0 < br_idx < 15 and sr_idx < 3:
+                    break
+                off += 1
+            else:
+                return None
+            kbps = _MP3_BITRATES[1 if ver == 3 else 2][br_idx]
+            sr = _MP3_SAMPLERATES[ver][sr_idx]
+            spf = 1152 if ver == 3 else 576
+            mono = ((h >> 6) & 3) == 3
+            side = (17 if mono else 32) if ver == 3 else (9 if mono else 17)
+
+            frames = None
+            x = off + 4 + side
+            if mm[x:x+4] in (b"Xing", b"Info"):
+                (flags,) = struct.unpack_from(">I", mm, x + 4)
+                if flags & 1: (frames,) = struct.unpack_from(">I", mm, x + 8)
+            elif mm[off+36:off+40] == b"VBRI":
+                (frames,) = struct.unpack_from(">I", mm, off + 36 + 14)
+            audio = size - off - (128 if mm[size-128:size-125] == b"TAG" else 0)
+    if frames:
+        duration = frames * spf / float(sr)
+        return duration, int(audio * 8 / duration / 1000) if duration > 0 else kbps
+    return audio * 8.0 / (kbps * 1000.0), kbps
+
+def get_mp3_meta(path: Path, compute=False):
+    """Metadaten aus dem Cache, sonst aus dem MP3-Header; mit compute=True
+    notfalls per Hüllkurve ermitteln."""
+    try:
+        key = _meta_key(path)
+    except OSError:
+        return None
+    meta = _meta_cache.get(key)
+    if meta is None:
+        try:
+            info = mp3_header_info(path)
+        except (OSError, ValueError, struct.error):
+            info = None
+        if info:
+            meta = _meta_cache[key] = {"duration": round(info[0], 3), "env_frames": None, "bitrate_kbps": info[1]}
+    if (meta is None or meta.get("env_frames") is None) and compute:
+        try:
+            compute_envelope(path)
+        except Exception as e:
+            set_last_error(f"Metadaten ({path.name}): {e}")
+        meta = _meta_cache.get(key)
+    return meta
+
+def load_meta_cache():
+    try:
+        entries = json_loads_bytes(META_CACHE_PATH.read_bytes())
+        for e in entries:
+            _meta_cache[(e["path"], int(e["mtime_ns"]), int(e["size"]))] = e["meta"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[meta] Cache nicht lesbar ({META_CACHE_PATH}): {e}", file=sys.stderr)
+
+def save_meta_cache():
+    try:
+        META_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        entries = [{"path": k[0], "mtime_ns": k[1], "size": k[2], "meta": v} for k, v in _meta_cache.items()]
+        write_atomic(META_CACHE_PATH, json_dumps_bytes(entries, indent=False))
+    except Exception as e:
+        print(f"[meta] Cache nicht gespeichert ({META_CACHE_PATH}): {e}", file=sys.stderr)
+
+def format_duration(sec):
+    if sec is None: return ""
+    sec = int(round(sec))
+    return f"{sec // 60}:{sec % 60:02d}"
+
+# ===== MP3-Verzeichnis-Index =====
+# Mit watchdog wird die Dateiliste nur nach Dateisystem-Ereignissen (oder
+# SIGUSR1) neu eingelesen, sonst wenn sich die mtime des Verzeichnisses
+# ändert (Anlegen/Löschen/Umbenennen).
+_mp3_index = {"dir": None, "names": None, "observer": None, "mtime": None}
+_mp3_index_lock = threading.Lock()
+
+def _scan_mp3_names(d: Path):
+    # os.scandir liefert Name und Typ aus readdir, kein stat je Eintrag
+    # (nur bei Symlinks, deren Ziel geprüft werden muss)
+    try:
+        with os.scandir(d) as it:
+            return sorted(e.name for e in it if e.name.lower().endswith(".mp3") and e.is_file())
+    except OSError:
+        return []
+
+def invalidate_mp3_index():
+    with _mp3_index_lock:
+        _mp3_index["names"] = None
+
+def _mp3_names():
+    with _mp3_index_lock:
+        mtime = None
+        if _mp3_index["observer"] is None:
+            try:
+                mtime = SOUND_DIR.stat().st_mtime_ns
+            except OSError:
+                return []
+            if mtime != _mp3_index["mtime"]:
+                _mp3_index["names"] = None
+        if _mp3_index["names"] is None or _mp3_index["dir"] != SOUND_DIR:
+            _mp3_index["dir"] = SOUND_DIR
+            _mp3_index["names"] = _scan_mp3_names(SOUND_DIR)
+            _mp3_index["mtime"] = mtime
+        return list(_mp3_index["names"])
+
+if HAVE_WATCHDOG:
+    class _Mp3DirHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory: return
+            paths = (event.src_path, getattr(event, "dest_path", "") or "")
+            if any(str(p).lower().endswith(".mp3") for p in paths):
+                invalidate_mp3_index()
+
+def start_mp3_watch():
+    if not HAVE_WATCHDOG: return
+    with _mp3_index_lock:
+        old = _mp3_index["observer"]
+        _mp3_index["observer"] = None
+        _mp3_index["names"] = None
+    if old is not None:
+        try: old.stop(); old.join(timeout=1.0)
+        except Exception: pass
+    try:
+        obs = Observer()
+        obs.schedule(_Mp3DirHandler(), str(SOUND_DIR), recursive=False)
+        obs.daemon = True
+        obs.start()
+    except Exception as e:
+        print(f"[watchdog] {SOUND_DIR} wird nicht überwacht: {e}", file=sys.stderr)
+        return
+    with _mp3_index_lock:
+        _mp3_index["observer"] = obs
+
 def list_mp3s():
     files = []
     assignments = _normalized_assignment_map(cfg.get("file_categories", {}))
     cfg["file_categories"] = assignments
-    for pattern in ("*.mp3", "*.MP3"):
-        for p in sorted(SOUND_DIR.glob(pattern)):
-            cats = assignments.get(p.name, [])
-            files.append({
-                "name": p.stem.replace("_", " "),
-                "file": p.name,
-                "categories": cats,
-                "category": cats[0] if cats else None,
-            })
+    for name in _mp3_names():
+        p = SOUND_DIR / name
+        cats = assignments.get(p.name, [])
+        meta = get_mp3_meta(p)
+        files.append({
+            "name": p.stem.replace("_", " "),
+            "file": p.name,
+            "categories": cats,
+            "category": cats[0] if cats else None,
+            "duration": meta["duration"] if meta else None,
+        })
     return files
 
 def resolve_file(fn):
@@ -359,7 +665,33 @@ def resolve_file(fn):
         abort(404, "Datei nicht gefunden.")
     return p
 
+# Regexe für aplay/amixer-Ausgaben einmalig kompilieren
+_APLAY_DEV_RE   = re.compile(r"device\s+(\d+):\s+([^\[]+)\[([^\]]+)\]")
+_DEV_CARD_RE    = re.compile(r".*?(\d+),(\d+)")
+_AMIXER_SCTL_RE = re.compile(r"Simple mixer control '([^']+)'")
+_AMIXER_PCT_RE  = re.compile(r"\[(\d{1,3})%\]")
+
+# Gerätelisten (`aplay -l`, PortAudio) kurz zwischenspeichern: sie werden pro Seite
+# mehrfach abgefragt, ändern sich aber nur beim An-/Abstecken
+_DEV_CACHE = {}   # key -> (monotonic-Zeitpunkt, Ergebnis)
+
+def _cached(key, producer, ttl=DEVICE_CACHE_TTL):
+    now = time.monotonic()
+    ts, val = _DEV_CACHE.get(key, (0.0, None))
+    if val is not None and now - ts < ttl:
+        return val
+    val = producer()
+    _DEV_CACHE[key] = (now, val)
+    return val
+
+def invalidate_device_cache(key=None):
+    if key is None: _DEV_CACHE.clear()
+    else: _DEV_CACHE.pop(key, None)
+
 def aplay_list_devices():
+    return _cached("alsa", _aplay_list_devices)
+
+def _aplay_list_devices():
     out = run(["aplay","-l"]).stdout or ""
     devices, cur_card = [], None
     for line in out.splitlines():
@@ -370,7 +702,7 @@ def aplay_list_devices():
             except (ValueError, IndexError, AttributeError):
                 cur_card = None
         if "device" in line and cur_card is not None:
-            m = re.search(r"device\s+(\d+):\s+([^\[]+)\[([^\]]+)\]", line)
+            m = _APLAY_DEV_RE.search(line)
             if m:
                 dev = int(m.group(1))
                 devices.append({
@@ -382,7 +714,7 @@ def aplay_list_devices():
     return devices, out
 
 def device_to_card_index(dev):
-    m = re.match(r".*?(\d+),(\d+)", dev or "")
+    m = _DEV_CARD_RE.match(dev or "")
     if m:
         return int(m.group(1))
     # Ensure we always return an integer
@@ -392,38 +724,107 @@ def device_to_card_index(dev):
     except (ValueError, TypeError):
         return 0
 
-def find_working_control(card_index, candidates):
+# Mixer-Erkennung einmal je Karte; Handles bleiben offen (ein ioctl pro Zugriff)
+_mixer_ctl_cache = {}   # (card, candidates) -> (Control-Name oder None, Ablaufzeit)
+_mixer_handles   = {}   # (card, control)    -> alsaaudio.Mixer
+
+def invalidate_mixer_cache():
+    _mixer_ctl_cache.clear()
+    _mixer_handles.clear()
+    invalidate_device_cache()
+
+def _alsa_mixer(card_index, ctl):
+    key = (int(card_index), ctl)
+    m = _mixer_handles.get(key)
+    if m is None:
+        m = alsaaudio.Mixer(control=ctl, cardindex=int(card_index))
+        _mixer_handles[key] = m
+    elif hasattr(m, "handleevents"):
+        m.handleevents()
+    return m
+
+def _detect_control(card_index, candidates):
+    if HAVE_ALSAAUDIO:
+        try:
+            names = alsaaudio.mixers(cardindex=int(card_index))
+            for ctl in list(candidates) + [n for n in names if n not in candidates]:
+                if ctl not in names: continue
+                try:
+                    if _alsa_mixer(card_index, ctl).getvolume():
+                        return ctl
+                except alsaaudio.ALSAAudioError:
+                    continue
+        except Exception:
+            pass
     for ctl in candidates:
         r = run(["amixer","-c",str(card_index),"get",ctl])
         if r.returncode == 0 and "[" in r.stdout:
             return ctl
     r = run(["amixer","-c",str(card_index),"scontrols"])
-    m = re.findall(r"Simple mixer control '([^']+)'", r.stdout or "")
+    m = _AMIXER_SCTL_RE.findall(r.stdout or "")
     return m[0] if m else None
 
+def find_working_control(card_index, candidates):
+    key = (card_index, tuple(candidates))
+    hit = _mixer_ctl_cache.get(key)
+    now = time.monotonic()
+    if hit is not None and now < hit[1]:
+        return hit[0]
+    # auch "kein Control" merken, sonst startet jede Anfrage die Suche neu
+    ctl = _detect_control(card_index, candidates)
+    _mixer_ctl_cache[key] = (ctl, now + MIXER_CACHE_TTL)
+    return ctl
+
 def parse_amixer_state(text):
-    percents = re.findall(r"\[(\d{1,3})%\]", text or "")
+    percents = _AMIXER_PCT_RE.findall(text or "")
     percent = int(percents[-1]) if percents else None
     muted = None
     if "[off]" in text: muted = True
     if "[on]" in text:  muted = False if muted is None else muted
     return percent, muted
 
+def _alsa_volume_state(card_index, ctl):
+    m = _alsa_mixer(card_index, ctl)
+    vols = m.getvolume()
+    try:
+        muted = any(m.getmute())
+    except alsaaudio.ALSAAudioError:
+        muted = None   # Control ohne Schalter
+    return (int(vols[-1]) if vols else None), muted
+
 def get_volume_state():
-    ctl = find_working_control(cfg["alsa_card_index"], cfg["mixer_candidates"])
+    card = cfg["alsa_card_index"]
+    ctl = find_working_control(card, cfg["mixer_candidates"])
     if not ctl: return None, None, None
-    r = run(["amixer","-c",str(cfg["alsa_card_index"]),"get",ctl])
+    if HAVE_ALSAAUDIO:
+        try:
+            vol, muted = _alsa_volume_state(card, ctl)
+            return vol, muted, ctl
+        except Exception:
+            _mixer_handles.pop((int(card), ctl), None)
+    r = run(["amixer","-c",str(card),"get",ctl])
     if r.returncode != 0: return None, None, ctl
     vol, muted = parse_amixer_state(r.stdout)
     return vol, muted, ctl
 
 def set_volume(vol=None, toggle_mute=False):
-    ctl = find_working_control(cfg["alsa_card_index"], cfg["mixer_candidates"])
+    card = cfg["alsa_card_index"]
+    ctl = find_working_control(card, cfg["mixer_candidates"])
     if not ctl: return None, None, None
+    if HAVE_ALSAAUDIO:
+        try:
+            m = _alsa_mixer(card, ctl)
+            if vol is not None:
+                m.setvolume(int(max(0,min(100,vol))))
+            if toggle_mute:
+                m.setmute(0 if any(m.getmute()) else 1)
+            return get_volume_state()
+        except Exception:
+            _mixer_handles.pop((int(card), ctl), None)
     if vol is not None:
-        run(["amixer","-c",str(cfg["alsa_card_index"]),"set",ctl,f"{int(max(0,min(100,vol)))}%"])
+        run(["amixer","-c",str(card),"set",ctl,f"{int(max(0,min(100,vol)))}%"])
     if toggle_mute:
-        run(["amixer","-c",str(cfg["alsa_card_index"]),"set",ctl,"toggle"])
+        run(["amixer","-c",str(card),"set",ctl,"toggle"])
     return get_volume_state()
 
 # ===== Envelope / Servo =====
@@ -431,55 +832,316 @@ def angle_to_us(angle):
     angle = max(0.0, min(180.0, float(angle)))
     return int(SERVO_US_MIN + (SERVO_US_MAX - SERVO_US_MIN) * (angle / 180.0))
 
+def servo_lut(closed, open_):
+    # Pulsbreite je Hüllkurven-Stufe 0..255 (geschlossen -> offen)
+    return np.array([angle_to_us(closed + (open_ - closed) * i / 255.0) for i in range(256)], dtype=np.int32)
+
+def quantize_env_u8(env):
+    # Hüllkurve 0..1 -> Stufen 0..255 (bereits quantisierte bleiben unverändert)
+    env = np.asarray(env)
+    if env.dtype == np.uint8:
+        return env
+    q = np.multiply(env, 255.0, dtype=np.float32)
+    q += 0.5
+    np.clip(q, 0, 255, out=q)
+    return q.astype(np.uint8)
+
 _envelope_cache = {}
 def _env_key(path: Path):
     st = path.stat()
     return (str(path), int(st.st_mtime), st.st_size)
 
-def dbfs(x): return 20*np.log10(np.maximum(x, 1e-12))
+def _iter_rms_blocks(mp3_path: Path, frame_ms, sr, read_frames):
+    """RMS je Frame direkt aus dem mpg123-PCM-Strom (mono, int16), blockweise.
+
+    Die dekodierten Samples werden gelesen und sofort reduziert, die komplette
+    Wellenform liegt also nie im Speicher. Liefert (rms_block, n_samples) je
+    Block; wird der Generator vorzeitig geschlossen, endet auch mpg123.
+    """
+    frame_len = max(1, int(sr * frame_ms / 1000.0))
+    cmd = ["mpg123", "-q", "-s", "-m", "-r", str(int(sr)), "-e", "s16", str(mp3_path)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    n_frames = 0
+    # ein Puffer für alle Blöcke; np.frombuffer ist nur eine Sicht darauf
+    buf = bytearray(frame_len * read_frames * 2)
+    try:
+        while True:
+            # gepuffertes readinto() füllt volle Blöcke (nur am Ende kürzer)
+            got = proc.stdout.readinto(buf)
+            x = np.frombuffer(buf, dtype=np.int16, count=got // 2)
+            if len(x) == 0: break
+            n = len(x)
+            tail = n % frame_len
+            if tail:
+                # nur der letzte Block ist kürzer: angebrochenen Frame verwerfen,
+                # außer die Datei ist kürzer als ein Frame
+                x = x[:n - tail] if (n_frames or n > tail) else np.pad(x, (0, frame_len - tail))
+            frames = x.reshape(-1, frame_len)
+            if len(frames) == 0: continue
+            # einsum: Quadrieren + Summieren in einem Durchlauf direkt auf int16
+            # (Akkumulation in float32, ohne Float-Kopie des Blocks)
+            blk = np.einsum("ij,ij->i", frames, frames, dtype=np.float32, casting="same_kind")
+            blk *= 1.0 / frame_len
+            np.sqrt(blk, out=blk)
+            blk *= 1.0 / 32768.0    # int16 -> ±1.0 erst auf die RMS-Werte
+            n_frames += len(blk)
+            yield blk, n
+    finally:
+        try: proc.stdout.close()
+        except Exception: pass
+        rc = proc.wait()
+    if n_frames == 0:
+        raise RuntimeError(f"mpg123 lieferte keine Samples (code={rc})")
+
+def mp3_envelope(mp3_path: Path, frame_ms=FRAME_MS, sr=ENV_SAMPLERATE):
+    """RMS je Frame für die ganze Datei. Gibt (rms, n_samples) zurück."""
+    rms = np.empty(1024, dtype=np.float32)
+    n_frames = n_samples = 0
+    for blk, n in _iter_rms_blocks(mp3_path, frame_ms, sr, ENV_READ_FRAMES):
+        k = len(blk)
+        if n_frames + k > len(rms):
+            rms = np.resize(rms, max(2 * len(rms), n_frames + k))
+        rms[n_frames:n_frames + k] = blk
+        n_frames += k
+        n_samples += n
+    return rms[:n_frames], n_samples
+
+def _env_sidecar(mp3_path: Path, frame_ms=FRAME_MS):
+    # SOUND_DIR/.envcache/<hash>.npy – Pfad, mtime, Größe, Frame-Länge und
+    # Dekodier-Rate im Hash, geänderte Dateien/Parameter treffen also nie
+    # einen alten Eintrag
+    st = mp3_path.stat()
+    h = hashlib.blake2b(f"{mp3_path.resolve()}|{st.st_mtime_ns}|{st.st_size}|{int(frame_ms)}|{ENV_SAMPLERATE}".encode("utf-8"),
+                        digest_size=8).hexdigest()
+    return SOUND_DIR / ".envcache" / f"{h}.npy"
+
+def _load_env_sidecar(mp3_path: Path, frame_ms=FRAME_MS):
+    try:
+        return np.load(_env_sidecar(mp3_path, frame_ms), mmap_mode="r")
+    except Exception:
+        return None
+
+def _save_env_sidecar(mp3_path: Path, env_u8, frame_ms=FRAME_MS):
+    try:
+        side = _env_sidecar(mp3_path, frame_ms)
+        side.parent.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"[envelope] Cache-Verzeichnis nicht nutzbar: {e}", file=sys.stderr)
+        return
+    tmp = side.with_name(side.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            np.save(f, quantize_env_u8(env_u8))
+        os.replace(tmp, side)
+    except Exception as e:
+        print(f"[envelope] Sidecar nicht gespeichert ({side}): {e}", file=sys.stderr)
+        try: tmp.unlink()
+        except Exception: pass
+
+def _smooth_env_py(env, atk_a, rel_a, y0):
+    # Attack/Release-Glättung (einpoliges IIR, Koeffizient je nach Richtung);
+    # y0 = Zustand am Blockende davor (0.0 für eine ganze Datei)
+    # alles float32 (auch der Zustand), numba soll nichts auf float64 heben
+    out = np.empty_like(env)
+    one = np.float32(1.0)
+    y = y0
+    for i in range(len(env)):
+        x = env[i]
+        if x > y: y = atk_a*y + (one-atk_a)*x
+        else:     y = rel_a*y + (one-rel_a)*x
+        out[i] = y
+    return out
+
+def _smooth_env_list(env, atk_a, rel_a, y0):
+    # dieselbe Glättung ohne numba: über Python-floats (tolist) statt
+    # numpy-Skalare je Index, gut doppelt so schnell; Ergebnis float32
+    atk_a, rel_a = float(atk_a), float(rel_a)
+    atk_b, rel_b = 1.0 - atk_a, 1.0 - rel_a
+    y = float(y0)
+    out = []
+    put = out.append
+    for x in env.tolist():
+        if x > y: y = atk_a*y + atk_b*x
+        else:     y = rel_a*y + rel_b*x
+        put(y)
+    return np.array(out, dtype=np.float32)
+
+if HAVE_NUMBA:
+    _smooth_env = numba.njit(cache=True, fastmath=True)(_smooth_env_py)
+    # JIT vorwärmen, aber nicht im Live-Subprozess: der braucht die Glättung
+    # nie, und das Laden aus dem Cache würde jeden Live-Start verzögern
+    if "--live" not in sys.argv[1:]:
+        try:
+            _smooth_env(np.zeros(4, dtype=np.float32), np.float32(0.5), np.float32(0.5), np.float32(0.0))
+        except Exception as e:
+            print(f"[numba] Glättung nicht kompilierbar, nutze Python: {e}", file=sys.stderr)
+            _smooth_env = _smooth_env_list
+else:
+    _smooth_env = _smooth_env_list
+
+def _env_step_py(rms, ref, y, atk_a, rel_a, gate, pw_closed, pw_open):
+    # ein Block des Live-Hüllkurvenfolgers: Gate, Normierung, Attack/Release,
+    # Pulsbreite (angle_to_us ist linear -> direkt zwischen den Endpunkten)
+    if rms < gate:   # Gate linear (10^(dBFS/20)), kein log10 je Block
+        x = 0.0
+    else:
+        x = min(1.0, max(0.0, rms / ref))
+    if x > y: y = atk_a*y + (1.0-atk_a)*x
+    else:     y = rel_a*y + (1.0-rel_a)*x
+    return y, pw_closed + (pw_open - pw_closed) * y
+
+if HAVE_NUMBA:
+    _env_step = numba.njit(cache=True, fastmath=True)(_env_step_py)
+else:
+    _env_step = _env_step_py
+
+def _gain_clip_np(src, dst, g):
+    # Verstärkung + Begrenzung auf [-1, 1] in zwei numpy-Durchläufen
+    np.multiply(src, g, out=dst)
+    np.clip(dst, -1.0, 1.0, out=dst)
+
+def _gain_clip_py(src, dst, g):
+    # dasselbe in einem Durchlauf (nur als numba-Kernel sinnvoll)
+    for i in range(src.size):
+        v = src[i] * g
+        dst[i] = -1.0 if v < -1.0 else (1.0 if v > 1.0 else v)
+
+if HAVE_NUMBA:
+    _gain_clip = numba.njit(cache=True, fastmath=True)(_gain_clip_py)
+else:
+    _gain_clip = _gain_clip_np
+
+_envelope_locks = {}
+_envelope_locks_guard = threading.Lock()
 
 def compute_envelope(mp3_path: Path, frame_ms=FRAME_MS):
     key = _env_key(mp3_path)
-    if key in _envelope_cache:
-        return _envelope_cache[key]
-
-    seg = AudioSegment.from_file(mp3_path)
-    samples = np.array(seg.get_array_of_samples()).astype(np.float32)
-    if seg.channels > 1:
-        samples = samples.reshape((-1, seg.channels)).mean(axis=1)
-    samples /= (1 << (8*seg.sample_width - 1))
-    sr = seg.frame_rate
-
-    frame_len = int(sr * frame_ms / 1000.0)
-    n_frames = max(1, len(samples)//frame_len)
-    rms = []
-    for i in range(n_frames):
-        w = samples[i*frame_len:(i+1)*frame_len]
-        if len(w) == 0: break
-        rms.append(np.sqrt(np.mean(w*w)))
-    rms = np.array(rms)
-
-    rms_db = dbfs(rms)
-    rms[rms_db < SILENCE_GATE_DBFS] = 0.0
-
-    ref = np.percentile(rms[rms>0], NORM_PERCENTILE) if np.any(rms>0) else 1.0
-    if ref <= 0: ref = 1.0
-    env = np.clip(rms/ref, 0, 1)
-
-    atk_a = np.exp(-frame_ms / max(1, ATTACK_MS))
-    rel_a = np.exp(-frame_ms / max(1, RELEASE_MS))
-    smooth = np.zeros_like(env)
-    y = 0.0
-    for i, x in enumerate(env):
-        if x > y: y = atk_a*y + (1-atk_a)*x
-        else:     y = rel_a*y + (1-rel_a)*x
-        smooth[i] = y
+    res = _envelope_cache.get(key)
+    if res is not None:
+        return res
+    # je Datei nur einmal dekodieren, auch wenn Vorberechnung und Play gleichzeitig fragen
+    with _envelope_locks_guard:
+        lock = _envelope_locks.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            res = _envelope_cache.get(key)
+            if res is None:
+                res = _compute_envelope(mp3_path, frame_ms, key)
+    finally:
+        # auch bei Fehlern (defekte MP3, mpg123 fehlt) nicht liegen lassen
+        with _envelope_locks_guard:
+            _envelope_locks.pop(key, None)
+    return res
 
-    times = np.arange(len(smooth)) * (frame_ms/1000.0)
-    duration = len(samples)/sr
+def cached_envelope(mp3_path: Path, frame_ms=FRAME_MS):
+    """Hüllkurve aus Speicher oder Sidecar, ohne zu dekodieren (sonst None)."""
+    key = _env_key(mp3_path)
+    res = _envelope_cache.get(key)
+    if res is None:
+        res = _envelope_from_sidecar(mp3_path, frame_ms, key)
+    return res
+
+def _envelope_from_sidecar(mp3_path: Path, frame_ms, key):
+    cached = _load_env_sidecar(mp3_path, frame_ms)
+    if cached is None or len(cached) == 0:
+        return None
+    times = np.arange(len(cached)) * (frame_ms/1000.0)
+    res = (times, cached, len(cached) * frame_ms/1000.0)
+    _envelope_cache[key] = res
+    remember_mp3_meta(mp3_path, len(cached), res[2])
+    return res
+
+def _envelope_params(frame_ms):
+    gate = np.float32(10.0 ** (SILENCE_GATE_DBFS / 20.0))
+    atk_a = np.float32(np.exp(-frame_ms / max(1, ATTACK_MS)))
+    rel_a = np.float32(np.exp(-frame_ms / max(1, RELEASE_MS)))
+    return gate, atk_a, rel_a
+
+def _norm_ref(voiced):
+    # Perzentil der stimmhaften Frames als Normierungsreferenz per np.partition
+    # (Introselect, O(n)) statt Sortierung + Interpolation; Rang wie
+    # np.percentile(method="lower") und wie im Live-Fenster
+    if voiced.size == 0:
+        return 1.0
+    k = int(NORM_PERCENTILE / 100.0 * (voiced.size - 1))
+    ref = float(np.partition(voiced, k)[k])
+    return ref if ref > 0 else 1.0
+
+def _store_envelope(mp3_path: Path, frame_ms, key, rms, duration):
+    # exakte Hüllkurve (Referenz über die ganze Datei) -> Cache, Sidecar, Meta
+    gate, atk_a, rel_a = _envelope_params(frame_ms)
+    rms = np.array(rms, dtype=np.float32)
+
+    # Gate linear statt über dBFS vergleichen (spart log10 je Frame)
+    rms[rms < gate] = 0.0
+
+    ref = _norm_ref(rms[rms > 0])
+    env = np.multiply(rms, np.float32(1.0 / ref), out=rms)
+    np.clip(env, 0, 1, out=env)
+
+    smooth = _smooth_env(env, atk_a, rel_a, np.float32(0.0))
+
+    # direkt als Servo-Stufen 0..255 ablegen (Cache, Sidecar, LUT-Index)
+    env_u8 = quantize_env_u8(smooth)
+    times = np.arange(len(env_u8)) * (frame_ms/1000.0)
+
+    _save_env_sidecar(mp3_path, env_u8, frame_ms)
+    _envelope_cache[key] = (times, env_u8, duration)
+    remember_mp3_meta(mp3_path, len(env_u8), duration)
+    return times, env_u8, duration
+
+def _compute_envelope(mp3_path: Path, frame_ms, key):
+    res = _envelope_from_sidecar(mp3_path, frame_ms, key)
+    if res is not None:
+        return res
+    sr = ENV_SAMPLERATE
+    rms, n_samples = mp3_envelope(mp3_path, frame_ms, sr)
+    return _store_envelope(mp3_path, frame_ms, key, rms, n_samples/sr)
+
+def iter_envelope(mp3_path: Path, frame_ms=FRAME_MS, sr=ENV_SAMPLERATE):
+    """Hüllkurve blockweise (uint8) schon während mpg123 noch dekodiert.
+
+    Die Referenz ist das Perzentil der bisher gelesenen Frames, der Glätter
+    behält seinen Zustand über die Blöcke. Nach dem letzten Block wird die
+    exakte Hüllkurve wie bei compute_envelope gecacht.
+    """
+    gate, atk_a, rel_a = _envelope_params(frame_ms)
+    parts, voiced = [], []
+    y, n_samples = np.float32(0.0), 0
+    for blk, n in _iter_rms_blocks(mp3_path, frame_ms, sr, ENV_STREAM_FRAMES):
+        parts.append(blk)
+        n_samples += n
+        g = blk.copy()
+        g[g < gate] = 0.0
+        pos = g[g > 0]
+        if pos.size:
+            voiced.append(pos)
+        ref = _norm_ref(np.concatenate(voiced)) if voiced else 1.0
+        g *= np.float32(1.0 / ref)
+        np.clip(g, 0, 1, out=g)
+        smooth = _smooth_env(g, atk_a, rel_a, y)
+        y = smooth[-1]
+        yield quantize_env_u8(smooth)
+    _store_envelope(mp3_path, frame_ms, _env_key(mp3_path), np.concatenate(parts), n_samples/sr)
+
+# ===== Hüllkurven vorberechnen =====
+# Threads statt Prozesse: das Dekodieren läuft ohnehin im mpg123-Subprozess,
+# und die Ergebnisse landen so direkt in _envelope_cache.
+_prewarm_pool = {"ex": None}
+
+def _prewarm_one(path: Path):
+    try:
+        compute_envelope(path)
+    except Exception as e:
+        print(f"[envelope] Vorberechnung {path.name}: {e}", file=sys.stderr)
 
-    _envelope_cache[key] = (times, smooth, duration)
-    return times, smooth, duration
+def prewarm_envelopes(paths=None):
+    if _prewarm_pool["ex"] is None:
+        _prewarm_pool["ex"] = ThreadPoolExecutor(max_workers=ENV_PREWARM_WORKERS, thread_name_prefix="envelope")
+    if paths is None:
+        paths = [SOUND_DIR / n for n in _mp3_names()]
+    for p in paths:
+        _prewarm_pool["ex"].submit(_prewarm_one, p)
 
 def is_servo_active():
     return HAVE_PIGPIO and (pi is not None) and pi.connected and (cfg.get("servo_gpio") is not None)
@@ -498,13 +1160,137 @@ def power_off():
             try: pi.write(pg, 0)
             except Exception: pass
 
+def _make_sleep_until_ns():
+    # clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME) über ctypes: schläft bis
+    # zu einem absoluten Zeitpunkt (gleiche Uhr wie time.monotonic_ns)
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        nanosleep = libc.clock_nanosleep
+    except (OSError, AttributeError):
+        nanosleep = None
+    if nanosleep is None or not hasattr(time, "CLOCK_MONOTONIC"):
+        def sleep_until_ns(deadline_ns):
+            dt = deadline_ns - time.monotonic_ns()
+            if dt > 0: time.sleep(dt / 1e9)
+        return sleep_until_ns
+
+    class _timespec(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+    nanosleep.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.POINTER(_timespec), ctypes.c_void_p]
+    nanosleep.restype = ctypes.c_int
+    clock, abstime, eintr = time.CLOCK_MONOTONIC, 1, 4   # TIMER_ABSTIME, EINTR
+
+    def sleep_until_ns(deadline_ns):
+        ts = _timespec(*divmod(int(deadline_ns), 1_000_000_000))
+        while nanosleep(clock, abstime, ctypes.byref(ts), None) == eintr:
+            pass
+    return sleep_until_ns
+
+sleep_until_ns = _make_sleep_until_ns()
+
+class EnvRing:
+    """Ringpuffer (ein Produzent, ein Konsument) für Servo-Werte.
+    Kein Lock pro Wert: nur der Produzent schreibt w, nur der Konsument r;
+    das Event weckt den Konsumenten. N wird auf eine Zweierpotenz gerundet.
+    Live überschreibt bei vollem Puffer, das Hüllkurven-Streaming wartet
+    per put_wait() auf Platz und meldet das Ende über done."""
+    def __init__(self, n=1024):
+        n = 1 << max(1, int(n) - 1).bit_length()
+        self.buf = np.empty(n, dtype=np.float32)
+        self.mask = n - 1
+        self.w = 0
+        self.r = 0
+        self.ev = threading.Event()
+        self.space = threading.Event()
+        self.done = False
+
+    def put(self, v):
+        self.buf[self.w & self.mask] = v
+        self.w += 1
+        self.ev.set()
+
+    def put_wait(self, v, stop):
+        # blockierend: erst schreiben, wenn der Konsument Platz gemacht hat
+        while self.w - self.r > self.mask:
+            if stop.is_set(): return False
+            self.space.wait(0.05)
+            self.space.clear()
+        self.put(v)
+        return True
+
+    def close(self):
+        self.done = True
+        self.ev.set()
+
+    def latest(self, timeout=None):
+        # Wartet auf neue Werte und liefert nur den jüngsten (None ohne neue);
+        # ältere, noch nicht abgeholte Werte verfallen
+        self.ev.wait(timeout)
+        self.ev.clear()
+        w = self.w
+        if w == self.r: return None
+        self.r = w
+        self.space.set()
+        return float(self.buf[(w - 1) & self.mask])
+
+    def drain(self, timeout=None):
+        # Wartet auf neue Werte und liefert alle seit dem letzten Aufruf
+        self.ev.wait(timeout)
+        self.ev.clear()
+        w, r = self.w, self.r
+        if w - r > self.mask:   # Konsument zu langsam -> älteste verwerfen
+            r = w - self.mask - 1
+        while r < w:
+            yield float(self.buf[r & self.mask])
+            r += 1
+        self.r = r
+        self.space.set()
+
+def _run_servo_wave(s_gpio, pulsewidths, frame_ms, t0, stop_evt):
+    """Spielt die Pulsbreiten als Folge von pigpio-Waves ab.
+
+    Je 20-ms-Periode ein High-/Low-Pulspaar, in Blöcken zu SERVO_WAVE_PERIODS;
+    höchstens zwei Waves liegen im Daemon (laufende + per SYNC angehängte).
+    """
+    step = SERVO_PERIOD_US / (frame_ms * 1000.0)
+    n_periods = int(len(pulsewidths) / step)
+    # bereits verstrichene Perioden überspringen (z. B. bei sync_lead_ms)
+    first = max(0, (time.monotonic_ns() - t0) // (SERVO_PERIOD_US * 1000))
+    idx = (np.arange(first, n_periods) * step).astype(np.int64)
+    per = np.asarray(pulsewidths)[idx].tolist()
+    mask = 1 << s_gpio
+    pi.set_servo_pulsewidth(s_gpio, 0)   # Servo-PWM freigeben, die Wave übernimmt
+    pi.set_mode(s_gpio, pigpio.OUTPUT)
+    sleep_until_ns(t0 + first * SERVO_PERIOD_US * 1000)
+    queued = deque()
+    try:
+        for i in range(0, len(per), SERVO_WAVE_PERIODS):
+            while len(queued) >= 2 and not stop_evt.is_set():
+                if pi.wave_tx_at() != queued[0]:
+                    pi.wave_delete(queued.popleft())
+                else:
+                    stop_evt.wait(0.05)
+            if stop_evt.is_set(): return
+            pulses = []
+            for pw in per[i:i + SERVO_WAVE_PERIODS]:
+                pulses.append(pigpio.pulse(mask, 0, pw))
+                pulses.append(pigpio.pulse(0, mask, SERVO_PERIOD_US - pw))
+            pi.wave_add_generic(pulses)
+            wid = pi.wave_create()
+            pi.wave_send_using_mode(wid, pigpio.WAVE_MODE_ONE_SHOT_SYNC)
+            queued.append(wid)
+        while pi.wave_tx_busy() and not stop_evt.is_set():
+            stop_evt.wait(0.05)
+    finally:
+        pi.wave_tx_stop()
+        for wid in queued:
+            pi.wave_delete(wid)
+
 def servo_open_close_by_envelope(proc, mp3_path: Path, precomputed=None):
     if not is_servo_active():
         return
-    if precomputed:
-        times, env, duration = precomputed
-    else:
-        times, env, duration = compute_envelope(mp3_path)
+    if not precomputed:
+        precomputed = cached_envelope(mp3_path)
 
     stop_evt = threading.Event()
     servo_thread["stop"] = stop_evt
@@ -514,18 +1300,77 @@ def servo_open_close_by_envelope(proc, mp3_path: Path, precomputed=None):
     open_  = float(cfg.get("open_angle", 65))
     lead   = float(cfg.get("sync_lead_ms", 0)) / 1000.0
 
+    lut = servo_lut(closed, open_)
+    deadband = int(cfg.get("servo_deadband_us", 0))
+    min_iv   = float(cfg.get("servo_min_interval_ms", 0)) / 1000.0
+
     def set_angle(a):
         pi.set_servo_pulsewidth(s_gpio, angle_to_us(a))
 
+    lead_ns, min_iv_ns = int(lead * 1e9), int(min_iv * 1e9)
+
+    if precomputed:
+        times, env, duration = precomputed
+        # Pulsbreite je Frame vorab für die ganze Hüllkurve (ein LUT-Gather)
+        pulsewidths = lut[quantize_env_u8(env)].tolist()
+        # absolute Frame-Zeitpunkte in ns: kein Drift durch aufsummierte Schlafzeiten
+        times_ns = (np.asarray(times, dtype=np.float64) * 1e9).astype(np.int64)
+        def frames():
+            return zip(times_ns.tolist(), pulsewidths)
+    else:
+        pulsewidths = None
+        # noch nicht berechnet: Wiedergabe läuft schon, die Hüllkurve wird
+        # parallel dekodiert und über den Ringpuffer nachgeliefert
+        ring = EnvRing(1024)
+        lut_list = lut.tolist()
+        frame_ns = int(FRAME_MS * 1_000_000)
+
+        def _producer():
+            gen = iter_envelope(mp3_path)
+            try:
+                for blk in gen:
+                    for v in blk.tolist():
+                        if not ring.put_wait(v, stop_evt): return
+            except Exception as e:
+                set_last_error(f"Envelope-Berechnung: {e}")
+            finally:
+                gen.close()
+                ring.close()
+
+        def frames():
+            i = 0
+            while not stop_evt.is_set():
+                got = False
+                for v in ring.drain(0.1):
+                    got = True
+                    yield i * frame_ns, lut_list[int(v)]
+                    i += 1
+                if not got and ring.done and ring.r == ring.w:
+                    return
+
+        threading.Thread(target=_producer, daemon=True).start()
+
     def _runner():
         set_angle(closed); time.sleep(0.05)
-        t0 = time.perf_counter() - lead
-        for t, e in zip(times, env):
-            if stop_evt.is_set(): break
-            dt = (t0 + t) - time.perf_counter()
-            if dt > 0: time.sleep(dt)
-            a = closed + (open_ - closed) * float(e)
-            set_angle(a)
+        t0 = time.monotonic_ns() - lead_ns
+        if isinstance(proc, Mpg123Playback):
+            # Uhr am ersten tatsächlich dekodierten Frame ausrichten
+            started = proc.wait_started(0.5)
+            if started is not None: t0 = started - lead_ns
+        if SERVO_WAVE and pulsewidths:
+            try:
+                _run_servo_wave(s_gpio, pulsewidths, FRAME_MS, t0, stop_evt)
+            except Exception as e:
+                set_last_error(f"Servo-Waveform: {e}")
+        else:
+            last_pw, last_ts = angle_to_us(closed), 0
+            for t, pw in frames():
+                if stop_evt.is_set(): break
+                sleep_until_ns(t0 + t)
+                now = time.monotonic_ns()
+                if abs(pw - last_pw) < deadband or (now - last_ts) < min_iv_ns: continue
+                pi.set_servo_pulsewidth(s_gpio, pw)
+                last_pw, last_ts = pw, now
         while not stop_evt.is_set():
             if proc.poll() is not None: break
             time.sleep(0.02)
@@ -561,15 +1406,171 @@ def stop_servo():
     power_off()
 
 # ===== Playback Start/Stop =====
+class Mpg123Remote:
+    """Dauerhaft laufendes `mpg123 -R`: Prozess und Ausgabe bleiben offen,
+    ein Sound ist nur noch ein LOAD-Befehl über stdin.
+    Statuszeilen: @F = Frame-Fortschritt, @P 0 = gestoppt/Ende, @E = Fehler."""
+    def __init__(self, dev):
+        self.dev = dev
+        self.cond = threading.Condition()
+        self.gen = 0            # zählt LOAD-Befehle; jede Wiedergabe hat ihre Nummer
+        self.state = "idle"     # idle | loading | playing | stopping
+        self.started = None     # monotonic_ns beim ersten @F der aktuellen Wiedergabe
+        self.pos = 0.0          # Sekunden laut letztem @F
+        self.error = None
+        self.proc = subprocess.Popen(["mpg123", "-R", "-o", "alsa", "-a", dev],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     text=True, bufsize=1, start_new_session=True)
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def _reader(self):
+        try:
+            for line in self.proc.stdout:
+                if line.startswith("@F"):
+                    parts = line.split()
+                    with self.cond:
+                        if self.state == "loading":
+                            self.state = "playing"; self.started = time.monotonic_ns()
+                            self.cond.notify_all()
+                        try: self.pos = float(parts[3])
+                        except (IndexError, ValueError): pass
+                elif line.startswith("@P 0"):
+                    with self.cond:
+                        # Ende der Wiedergabe bzw. Bestätigung eines STOP; @P 0 eines
+                        # vorherigen STOP nicht auf das neue LOAD beziehen
+                        if self.state in ("playing", "stopping"):
+                            self.state = "idle"; self.cond.notify_all()
+                elif line.startswith("@E"):
+                    with self.cond:
+                        self.error = line[2:].strip()
+                        if self.state == "loading":
+                            self.state = "idle"
+                        self.cond.notify_all()
+        except Exception:
+            pass
+        with self.cond:
+            self.state = "idle"; self.cond.notify_all()
+
+    def _send(self, cmd):
+        self.proc.stdin.write(cmd + "\n")
+        self.proc.stdin.flush()
+
+    def load(self, path: Path):
+        with self.cond:
+            # ein laufender STOP muss erst bestätigt sein, sonst landen dessen
+            # letztes @F und @P 0 bei der neuen Wiedergabe
+            self.cond.wait_for(lambda: self.state != "stopping" or not self.alive(), MPG123_STOP_WAIT_S)
+            self.gen += 1
+            self.state, self.started, self.pos, self.error = "loading", None, 0.0, None
+            gen = self.gen
+            self._send(f"LOAD {path}")
+        return Mpg123Playback(self, gen)
+
+    def active(self, gen):
+        return self.gen == gen and self.state not in ("idle", "stopping") and self.alive()
+
+    def stop(self, gen):
+        with self.cond:
+            if self.active(gen) and self.state != "stopping":
+                try: self._send("STOP")
+                except Exception: pass
+                # mpg123 schickt noch @F des laufenden Frames, dann @P 0:
+                # erst danach gilt der Player als frei (begrenzt gewartet)
+                self.state = "stopping"; self.cond.notify_all()
+                self.cond.wait_for(lambda: self.state != "stopping" or not self.alive(), MPG123_STOP_WAIT_S)
+                if self.state == "stopping": self.state = "idle"
+                self.cond.notify_all()
+
+    def close(self):
+        try:
+            self._send("QUIT")
+            self.proc.wait(timeout=1.0)
+        except Exception:
+            _signal_group(self.proc, signal.SIGKILL)
+            try: self.proc.wait(timeout=1.0)
+            except Exception: pass
+
+class Mpg123Playback:
+    """Eine Wiedergabe im Remote-mpg123 mit der Popen-Schnittstelle, die
+    Servo, Status und Befehls-Trigger nutzen (poll/wait/terminate/kill)."""
+    def __init__(self, remote, gen):
+        self.remote, self.gen = remote, gen
+
+    @property
+    def pid(self):
+        return self.remote.proc.pid
+
+    def poll(self):
+        return None if self.remote.active(self.gen) else 0
+
+    def wait(self, timeout=None):
+        with self.remote.cond:
+            if not self.remote.cond.wait_for(lambda: not self.remote.active(self.gen), timeout):
+                raise subprocess.TimeoutExpired("mpg123 -R", timeout)
+        return 0
+
+    def wait_started(self, timeout):
+        """monotonic_ns des ersten dekodierten Frames oder None."""
+        r = self.remote
+        with r.cond:
+            r.cond.wait_for(lambda: r.gen != self.gen or r.state != "loading" or not r.alive(), timeout)
+            return r.started if r.gen == self.gen else None
+
+    def terminate(self):
+        self.remote.stop(self.gen)
+
+    def kill(self):
+        # Hängt der Remote-Prozess, wird er beim nächsten Play neu gestartet
+        _signal_group(self.remote.proc, signal.SIGKILL)
+
+_mpg123_remote = {"r": None}
+
+def close_mpg123_remote():
+    r = _mpg123_remote["r"]
+    _mpg123_remote["r"] = None
+    if r is not None:
+        r.close()
+
+def release_alsa_output():
+    # Der Remote-mpg123 hält das ALSA-Gerät auch zwischen zwei Sounds offen.
+    # Vor speaker-test bzw. Live auf demselben Gerät freigeben, sonst EBUSY
+    # bei Geräten ohne dmix (z. B. plughw:1,0); das nächste Play startet ihn neu.
+    with play_lock:
+        stop_current()
+        close_mpg123_remote()
+
+def _start_play_remote(path: Path):
+    dev = cfg["alsa_device"]
+    r = _mpg123_remote["r"]
+    if r is None or not r.alive() or r.dev != dev:
+        close_mpg123_remote()
+        r = _mpg123_remote["r"] = Mpg123Remote(dev)
+    pb = r.load(path)
+    if pb.wait_started(1.0) is None:
+        err = r.error or "kein Frame dekodiert"
+        pb.terminate()
+        close_mpg123_remote()
+        raise RuntimeError(f"mpg123 -R auf {dev}: {err}")
+    last_cmd["text"] = f"mpg123 -R -o alsa -a {shlex.quote(dev)}  ← LOAD {shlex.quote(str(path))}"
+    return pb
+
 def start_play(path: Path):
+    if MPG123_REMOTE and cfg.get("alsa_device") and "\n" not in str(path):
+        try:
+            return _start_play_remote(path)
+        except Exception as e:
+            print(f"[audio] Remote-mpg123 nicht nutzbar, starte einzeln: {e}", file=sys.stderr)
     candidates = [cfg["alsa_device"], "plughw:1,0", "default", "plughw:0,0", "plughw:2,0", "plughw:3,0"]
     last_err = None
     for dev in [d for d in candidates if d]:
         proc = None
         try:
             cmd = ["mpg123","-q","-o","alsa","-a",dev,str(path)]
-            last_cmd["text"] = " ".join(cmd)
-            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, preexec_fn=os.setsid)
+            last_cmd["text"] = " ".join(shlex.quote(c) for c in cmd)
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
             time.sleep(START_WAIT_MS/1000.0)
             if proc.poll() is None:
                 print(f"[audio] using device: {dev}")
@@ -592,19 +1593,34 @@ def start_play(path: Path):
                     pass
     raise RuntimeError(last_err or "Kein Ausgabegerät funktioniert (mpg123 endete sofort).")
 
+def _signal_group(p, sig):
+    # mpg123 läuft (start_new_session) in eigener Prozessgruppe -> Gruppe beenden
+    try:
+        os.killpg(os.getpgid(p.pid), sig)
+    except ProcessLookupError:
+        pass
+    except OSError:
+        p.send_signal(sig)
+
 def stop_current():
     with play_lock:
         p = current_proc.get("p")
         if p:
             try:
                 # Terminate if still running
-                if p.poll() is None:
+                if isinstance(p, Mpg123Playback):
                     p.terminate()
                     try:
                         p.wait(timeout=2.0)
                     except subprocess.TimeoutExpired:
-                        # Force kill if terminate didn't work
                         p.kill()
+                elif p.poll() is None:
+                    _signal_group(p, signal.SIGTERM)
+                    try:
+                        p.wait(timeout=2.0)
+                    except subprocess.TimeoutExpired:
+                        # Force kill if terminate didn't work
+                        _signal_group(p, signal.SIGKILL)
                         p.wait()
                 else:
                     # Clean up zombie process
@@ -621,15 +1637,20 @@ PAGE_INDEX = """<!doctype html>
 <head>
 <meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
 <title>{{ page_title|e }}</title>
+<link rel="preload" href="/categories" as="fetch" crossorigin>
 <script>
 (function(){
   try{
+    // eine MediaQueryList für die ganze Seite (Theme-Init und Change-Listener)
+    const mql = window.__mqlDark = window.matchMedia ? window.matchMedia('(prefers-color-scheme: dark)') : null;
     const stored = localStorage.getItem('theme');
-    const prefersDark = window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches;
+    const prefersDark = !!(mql && mql.matches);
     const theme = stored || (prefersDark ? 'dark' : 'light');
     const root = document.documentElement;
     root.classList.toggle('dark', theme === 'dark');
     root.dataset.theme = theme;
+    // einmal gelesen, der Rest der Seite nutzt diesen Wert
+    window.__themePref = {stored, theme};
   }catch(e){}
 })();
 </script>
@@ -669,7 +1690,7 @@ PAGE_INDEX = """<!doctype html>
   body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: clamp(12px, 4vw, 28px); transition: background 0.3s, color 0.3s; font-size: 16px; line-height: 1.5; }
   header { display:flex; justify-content:space-between; align-items:center; margin-bottom:12px; gap:12px; flex-wrap:wrap; }
   h1 { margin:0; font-size: clamp(22px, 5vw, 30px); }
-  a.btn, button.btn { text-decoration:none; border:1px solid var(--border); padding:10px 14px; border-radius:var(--radius); color:var(--fg); background:var(--button-bg); cursor:pointer; transition:background 0.2s, border-color 0.2s; min-height:44px; }
+  a.btn, button.btn { text-decoration:none; border:1px solid var(--border); padding:10px 14px; border-radius:var(--radius); color:var(--fg); background:var(--button-bg); cursor:pointer; min-height:44px; }
   a.btn:hover, button.btn:hover { background:var(--button-hover); border-color:var(--border-strong); }
   button, input, select { font-size:15px; min-height:38px; }
   button { touch-action: manipulation; -webkit-tap-highlight-color: transparent; }
@@ -681,14 +1702,14 @@ PAGE_INDEX = """<!doctype html>
   input[type="file"] { color: var(--fg); }
   .upload-group input[type="file"] { padding:6px 0; }
   select { min-width:180px; }
-  button { padding:8px 12px; border-radius:var(--radius); border:1px solid var(--border); background:var(--button-bg); color:var(--fg); cursor:pointer; transition:background 0.2s, border-color 0.2s; }
+  button { padding:8px 12px; border-radius:var(--radius); border:1px solid var(--border); background:var(--button-bg); color:var(--fg); cursor:pointer; }
   button:hover { background:var(--button-hover); border-color:var(--border-strong); }
   .toolbar .group { display:flex; gap:6px; align-items:center; flex-wrap:wrap; flex:1 1 200px; }
   .toolbar .group.search-group { flex:1 1 220px; flex-wrap:nowrap; }
   .toolbar .group.search-group input[type="search"] { flex:1 1 auto; min-width:0; width:auto; }
   .toolbar .group.search-group button { flex:0 0 auto; width:auto; white-space:nowrap; }
   .list { display:flex; flex-direction:column; gap:8px; }
-  .item { display:flex; justify-content:space-between; align-items:center; border:1px solid var(--border); border-radius:var(--radius); padding: var(--pad); background:var(--card-bg); transition:background 0.2s, border-color 0.2s; gap:16px; }
+  .item { display:flex; justify-content:space-between; align-items:center; border:1px solid var(--border); border-radius:var(--radius); padding: var(--pad); background:var(--card-bg); gap:16px; }
   .left { display:flex; flex-direction:column; gap:4px; }
   .name { font-weight:600; }
   .playing { outline:2px solid var(--accent); }
@@ -771,14 +1792,10 @@ PAGE_INDEX = """<!doctype html>
         <div class="left">
           <div class="name">{{s.name}}</div>
           <div class="catLabel">{% if s.categories %}{{ s.categories|join(', ') }}{% else %}Keine Kategorie{% endif %}</div>
+          {% if s.duration %}<div class="meta">{{ format_duration(s.duration) }}</div>{% endif %}
         </div>
         <div class="right">
-          <select class="catSelect" data-file="{{s.file|e}}" multiple size="4">
-            <option value="" {% if not s.categories %}selected{% endif %}>Keine Kategorie</option>
-            {% for cat in categories %}
-              <option value="{{cat|e}}" {% if s.categories and cat in s.categories %}selected{% endif %}>{{cat}}</option>
-            {% endfor %}
-          </select>
+          <select class="catSelect" data-file="{{s.file|e}}" multiple size="4"></select>
           <div class="actions">
             <button class="previewBtn" data-file="{{s.file|e}}">🎧 Vorschau</button>
             <button class="playBtn" data-file="{{s.file|e}}">🔊 Abspielen</button>
@@ -793,50 +1810,8 @@ PAGE_INDEX = """<!doctype html>
     <span class="meta err" id="errorLabel"></span>
   </div>
 
+<script src="{{ asset_url('theme.js') }}"></script>
 <script>
-const themeToggle=document.getElementById('themeToggle');
-const root=document.documentElement;
-
-function setTheme(theme, store=true){
-  root.classList.toggle('dark', theme === 'dark');
-  root.dataset.theme = theme;
-  if(store){
-    try{ localStorage.setItem('theme', theme); }catch(e){}
-  }
-  if(themeToggle){ themeToggle.textContent = theme === 'dark' ? '☀️ Hell' : '🌙 Dunkel'; }
-}
-
-function initTheme(){
-  let theme = 'light';
-  try{
-    const stored = localStorage.getItem('theme');
-    if(stored){ theme = stored; }
-    else if(window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches){
-      theme = 'dark';
-    }
-  }catch(e){}
-  setTheme(theme, false);
-}
-
-initTheme();
-if(themeToggle){
-  themeToggle.addEventListener('click', ()=>{
-    const next = root.classList.contains('dark') ? 'light' : 'dark';
-    setTheme(next);
-  });
-}
-if(window.matchMedia){
-  try{
-    const mm = window.matchMedia('(prefers-color-scheme: dark)');
-    const handler = (ev)=>{
-      try{ if(localStorage.getItem('theme')) return; }catch(e){}
-      setTheme(ev.matches ? 'dark' : 'light', false);
-    };
-    if(typeof mm.addEventListener === 'function') mm.addEventListener('change', handler);
-    else if(typeof mm.addListener === 'function') mm.addListener(handler);
-  }catch(e){}
-}
-
 const q=document.getElementById('q');
 const clearBtn=document.getElementById('clearBtn');
 const catFilter=document.getElementById('catFilter');
@@ -853,30 +1828,23 @@ const previewPlayer=new Audio();
 previewPlayer.preload='none';
 let previewingFile=null;
 
-let categories={{ categories|tojson }};
-let assignments={{ assignments|tojson }};
-if(!Array.isArray(categories)) categories=[];
-if(!assignments || typeof assignments!=='object') assignments={};
+// Kategorien/Zuordnungen kommen per /categories (ETag, meist 304)
+let categories=[];
+let assignments={};
 
 function normalizeCategoriesList(value){
-  const out=[];
-  if(Array.isArray(value)){
-    for(const entry of value){
-      if(typeof entry!=='string') continue;
-      const trimmed=entry.trim();
-      if(trimmed && !out.includes(trimmed)) out.push(trimmed);
-    }
-  }else if(typeof value==='string'){
+  const seen=new Set();
+  if(typeof value==='string'){
     const trimmed=value.trim();
-    if(trimmed) out.push(trimmed);
+    if(trimmed) seen.add(trimmed);
   }else if(value && typeof value==='object' && typeof value[Symbol.iterator]==='function'){
     for(const entry of value){
       if(typeof entry!=='string') continue;
       const trimmed=entry.trim();
-      if(trimmed && !out.includes(trimmed)) out.push(trimmed);
+      if(trimmed) seen.add(trimmed);
     }
   }
-  return out;
+  return [...seen];
 }
 
 function normalizeAssignments(raw){
@@ -899,8 +1867,7 @@ function getItemCategories(el){
   return normalizeCategoriesList(el.dataset.category || []);
 }
 
-assignments=normalizeAssignments(assignments);
-
+const CAT_COLLATOR=new Intl.Collator('de',{sensitivity:'base'});
 function norm(s){ return (s||'').toLowerCase().normalize('NFKD'); }
 function setCatMsg(text, ok){
   if(!catMsg) return;
@@ -963,31 +1930,76 @@ async function performUpload(){
   }
 }
 setUploadMsg('', true);
+// Optionsliste einmal je Kategorienstand bauen, pro Select nur klonen
+let catOptionsTpl=null, catOptionsFor=null;
+function getCatOptionsTpl(){
+  if(catOptionsFor===categories) return catOptionsTpl;
+  const frag=document.createDocumentFragment();
+  frag.appendChild(new Option('Keine Kategorie',''));
+  for(const cat of categories) frag.appendChild(new Option(cat,cat));
+  catOptionsTpl=frag; catOptionsFor=categories;
+  return frag;
+}
 function fillCategorySelect(select, selectedValues){
   if(!select) return;
-  const selected=normalizeCategoriesList(selectedValues);
-  while(select.options.length) select.remove(0);
-  const noneOpt=document.createElement('option');
-  noneOpt.value='';
-  noneOpt.textContent='Keine Kategorie';
-  noneOpt.selected = selected.length===0;
-  select.appendChild(noneOpt);
-  for(const cat of categories){
-    const opt=document.createElement('option');
-    opt.value=cat;
-    opt.textContent=cat;
-    opt.selected = selected.includes(cat);
-    select.appendChild(opt);
+  const selected=new Set(normalizeCategoriesList(selectedValues));
+  const frag=getCatOptionsTpl().cloneNode(true);
+  for(const opt of frag.children) opt.selected = opt.value ? selected.has(opt.value) : selected.size===0;
+  select.replaceChildren(frag);
+}
+// Trigramm-Index über Titel/Datei: einmal aufbauen, die Liste ändert sich
+// nur per Reload (Upload/Löschen)
+let searchIndex=null;
+function trigrams(s){
+  const out=new Set();
+  for(let i=0;i+3<=s.length;i++) out.add(s.slice(i,i+3));
+  return out;
+}
+function getSearchIndex(){
+  if(searchIndex) return searchIndex;
+  const items = list ? [...list.querySelectorAll('.item')] : [];
+  const hays=items.map(el=>norm((el.dataset.name||'') + " " + (el.dataset.file||'')));
+  const tri=new Map();
+  hays.forEach((hay,i)=>{
+    for(const t of trigrams(hay)){
+      let set=tri.get(t);
+      if(!set){ set=new Set(); tri.set(t,set); }
+      set.add(i);
+    }
+  });
+  searchIndex={items, hays, tri};
+  return searchIndex;
+}
+function textMatches(needle){
+  // null = alle; sonst Set der Treffer-Indizes
+  if(!needle) return null;
+  const {hays, tri}=getSearchIndex();
+  const hits=new Set();
+  if(needle.length<3){
+    hays.forEach((hay,i)=>{ if(hay.includes(needle)) hits.add(i); });
+    return hits;
+  }
+  const sets=[];
+  for(const t of trigrams(needle)){
+    const set=tri.get(t);
+    if(!set) return hits;
+    sets.push(set);
+  }
+  sets.sort((a,b)=>a.size-b.size);
+  for(const i of sets[0]){
+    if(sets.every(set=>set.has(i)) && hays[i].includes(needle)) hits.add(i);
   }
+  return hits;
 }
 function applyFilter(){
-  const items = list ? [...list.querySelectorAll('.item')] : [];
+  const {items}=getSearchIndex();
   const needle=norm(q ? q.value.trim() : '');
   const selectedCat = catFilter ? catFilter.value : '';
+  const hits=textMatches(needle);
   let shown=0;
-  for(const el of items){
-    const hay=norm((el.dataset.name||'') + " " + (el.dataset.file||''));
-    const matchesText=!needle || hay.includes(needle);
+  for(let i=0;i<items.length;i++){
+    const el=items[i];
+    const matchesText=!hits || hits.has(i);
     const matchesCat=!selectedCat || getItemCategories(el).includes(selectedCat);
     const match=matchesText && matchesCat;
     el.style.display = match ? "" : "none";
@@ -996,15 +2008,12 @@ function applyFilter(){
   if(meta) meta.textContent = shown + " / " + items.length + " sichtbar";
 }
 function updateCategoryUI(){
-  const values = Object.values(assignments||{});
-  for(const entry of values){
-    const catList=normalizeCategoriesList(entry);
-    for(const cat of catList){
-      if(cat && !categories.includes(cat)) categories.push(cat);
-    }
+  const catSet=new Set(categories);
+  for(const entry of Object.values(assignments||{})){
+    for(const cat of normalizeCategoriesList(entry)) catSet.add(cat);
   }
-  categories = categories.filter((v,i,self)=>self.indexOf(v)===i);
-  categories.sort((a,b)=>a.localeCompare(b,'de',{sensitivity:'base'}));
+  categories = [...catSet];
+  categories.sort(CAT_COLLATOR.compare);
   if(catFilter){
     const prev = catFilter.value;
     while(catFilter.options.length) catFilter.remove(0);
@@ -1028,23 +2037,35 @@ function updateCategoryUI(){
   });
   applyFilter();
 }
-async function loadInfo(){
-  try{ const r=await fetch('/info'); const j=await r.json();
-       if(devLabel) devLabel.textContent = (j.alsa_device||"–") + (j.card_index!==undefined?(" (Karte "+j.card_index+")"):"");
-  }catch(e){ if(devLabel) devLabel.textContent="unbekannt"; }
+async function fetchInfo(){
+  const r=await fetch('/info');
+  return r.json();
 }
-async function loadCategories(){
-  try{
-    const res=await fetch('/categories');
-    const j=await res.json();
-    if(!res.ok || !j.ok) throw new Error(j.error||'Kategorien konnten nicht geladen werden');
-    categories=Array.isArray(j.categories)?j.categories:[];
-    assignments=normalizeAssignments(j.assignments);
-    setCatMsg('', true);
-    updateCategoryUI();
-  }catch(e){
-    setCatMsg(e.message||'Kategorien konnten nicht geladen werden', false);
-  }
+async function fetchCategories(){
+  const res=await fetch('/categories');
+  const j=await res.json();
+  if(!res.ok || !j.ok) throw new Error(j.error||'Kategorien konnten nicht geladen werden');
+  return j;
+}
+// beide Anfragen parallel, das Ergebnis in einem einzigen Frame anwenden
+async function loadInitial(){
+  const [info, cats]=await Promise.allSettled([fetchInfo(), fetchCategories()]);
+  requestAnimationFrame(()=>{
+    if(devLabel){
+      const j=info.value;
+      devLabel.textContent = info.status==='fulfilled'
+        ? (j.alsa_device||"–") + (j.card_index!==undefined?(" (Karte "+j.card_index+")"):"")
+        : "unbekannt";
+    }
+    if(cats.status==='fulfilled'){
+      categories=Array.isArray(cats.value.categories)?cats.value.categories:[];
+      assignments=normalizeAssignments(cats.value.assignments);
+      setCatMsg('', true);
+      updateCategoryUI();
+    }else{
+      setCatMsg(cats.reason && cats.reason.message || 'Kategorien konnten nicht geladen werden', false);
+    }
+  });
 }
 function setBusy(isBusy, txt){
   if(txt && meta) meta.textContent=txt;
@@ -1122,10 +2143,11 @@ if(list) list.addEventListener('change', async (e)=>{
   const file=sel.dataset.file;
   const prev=normalizeCategoriesList(assignments[file]);
   try{
-    const options=[...sel.options];
-    const noneOpt=options.find(o=>o.value==='');
-    let selectedValues=options.filter(o=>o.selected && o.value!=='').map(o=>o.value);
-    if(selectedValues.length>0 && noneOpt && noneOpt.selected){
+    // nur die gewählten Optionen ansehen statt alle Kategorien durchzugehen
+    const chosen=[...sel.selectedOptions];
+    const noneOpt=chosen.find(o=>o.value==='');
+    let selectedValues=chosen.filter(o=>o.value!=='').map(o=>o.value);
+    if(selectedValues.length>0 && noneOpt){
       noneOpt.selected=false;
     }
     const res=await fetch('/file-category',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({file, categories: selectedValues})});
@@ -1142,15 +2164,110 @@ if(list) list.addEventListener('change', async (e)=>{
   }
 });
 window.addEventListener('DOMContentLoaded', ()=>{
+  // Selects aus dem, was die Seite schon mitbringt, bis /categories antwortet
+  if(catFilter) categories=[...catFilter.options].map(o=>o.value).filter(Boolean);
+  document.querySelectorAll('.item').forEach(el=>{
+    const cats=getItemCategories(el);
+    if(cats.length) assignments[el.dataset.file]=cats;
+  });
   updateCategoryUI();
-  loadInfo();
-  loadCategories();
+  loadInitial();
 });
 </script>
 </body>
 </html>
 """
 
+# Theme-Umschalter aller Seiten (setzt das Vor-Paint-Skript im <head> voraus)
+THEME_JS = """const themeToggle=document.getElementById('themeToggle');
+const root=document.documentElement;
+
+function setTheme(theme, store=true){
+  root.classList.toggle('dark', theme === 'dark');
+  root.dataset.theme = theme;
+  if(store){
+    try{ localStorage.setItem('theme', theme); }catch(e){}
+    window.__themePref = {stored: theme, theme};
+  }
+  if(themeToggle){ themeToggle.textContent = theme === 'dark' ? '☀️ Hell' : '🌙 Dunkel'; }
+}
+
+function initTheme(){
+  if(window.__themePref){ setTheme(window.__themePref.theme, false); return; }
+  let theme = 'light';
+  try{
+    const stored = localStorage.getItem('theme');
+    if(stored){ theme = stored; }
+    else if(window.__mqlDark && window.__mqlDark.matches){
+      theme = 'dark';
+    }
+  }catch(e){}
+  setTheme(theme, false);
+}
+
+initTheme();
+if(themeToggle){
+  themeToggle.addEventListener('click', ()=>{
+    const next = root.classList.contains('dark') ? 'light' : 'dark';
+    setTheme(next);
+  }, {passive:true});
+}
+if(window.__mqlDark){
+  try{
+    const mm = window.__mqlDark;
+    const handler = (ev)=>{
+      if(window.__themePref){ if(window.__themePref.stored) return; }
+      else{ try{ if(localStorage.getItem('theme')) return; }catch(e){} }
+      setTheme(ev.matches ? 'dark' : 'light', false);
+    };
+    if(typeof mm.addEventListener === 'function') mm.addEventListener('change', handler);
+    else if(typeof mm.addListener === 'function') mm.addListener(handler);
+  }catch(e){}
+}
+"""
+
+# Gemeinsame Grundstile von Einstellungen und Live (Variablen, Hell/Dunkel,
+# Kopf, Knöpfe); die Startseite hat eigene Stile und bindet das nicht ein.
+COMMON_CSS = """*, *::before, *::after { box-sizing: border-box; }
+:root {
+  --radius: 14px;
+  --bg: #fafafa;
+  --fg: #111;
+  --card-bg: #ffffff;
+  --card-alt: #f0f0f0;
+  --border: #d8d8d8;
+  --border-strong: #c0c0c0;
+  --button-bg: #ffffff;
+  --button-hover: #f0f0f0;
+  --muted: #666666;
+  --err: #ff5252;
+  --ok: #2e7d32;
+  --accent: #2e7d32;
+}
+.dark {
+  --bg: #121212;
+  --fg: #f1f1f1;
+  --card-bg: #1e1e1e;
+  --card-alt: #232323;
+  --border: #3a3a3a;
+  --border-strong: #4a4a4a;
+  --button-bg: #1e1e1e;
+  --button-hover: #2a2a2a;
+  --muted: #a0a0a0;
+  --err: #ff6b6b;
+  --ok: #8bc34a;
+  --accent: #81c784;
+}
+html, body { background: var(--bg); color: var(--fg); }
+body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: clamp(12px, 4vw, 28px); transition: background 0.3s, color 0.3s; font-size: 16px; line-height: 1.5; }
+header { display:flex; justify-content:space-between; align-items:center; margin-bottom:12px; gap:12px; flex-wrap:wrap; }
+h1 { margin:0; font-size: clamp(22px, 5vw, 30px); }
+a.btn, button.btn { text-decoration:none; border:1px solid var(--border); padding:10px 14px; border-radius:var(--radius); background:var(--button-bg); color:var(--fg); cursor:pointer; min-height:44px; }
+a.btn:hover, button.btn:hover { background:var(--button-hover); border-color:var(--border-strong); }
+button { border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); padding:10px 14px; cursor:pointer; min-height:44px; font-size:16px; touch-action: manipulation; -webkit-tap-highlight-color: transparent; }
+button:hover { background:var(--button-hover); border-color:var(--border-strong); }
+"""
+
 PAGE_SETTINGS = """<!doctype html>
 <html lang="de">
 <head>
@@ -1159,62 +2276,29 @@ PAGE_SETTINGS = """<!doctype html>
 <script>
 (function(){
   try{
+    // eine MediaQueryList für die ganze Seite (Theme-Init und Change-Listener)
+    const mql = window.__mqlDark = window.matchMedia ? window.matchMedia('(prefers-color-scheme: dark)') : null;
     const stored = localStorage.getItem('theme');
-    const prefersDark = window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches;
+    const prefersDark = !!(mql && mql.matches);
     const theme = stored || (prefersDark ? 'dark' : 'light');
     const root = document.documentElement;
     root.classList.toggle('dark', theme === 'dark');
     root.dataset.theme = theme;
+    // einmal gelesen, der Rest der Seite nutzt diesen Wert
+    window.__themePref = {stored, theme};
   }catch(e){}
 })();
 </script>
+<link rel="stylesheet" href="{{ asset_url('soundboard.css') }}">
 <style>
-  *, *::before, *::after { box-sizing: border-box; }
-  :root {
-    --radius: 14px;
-    --bg: #fafafa;
-    --fg: #111;
-    --card-bg: #ffffff;
-    --card-alt: #f0f0f0;
-    --border: #d8d8d8;
-    --border-strong: #c0c0c0;
-    --button-bg: #ffffff;
-    --button-hover: #f0f0f0;
-    --muted: #666666;
-    --err: #ff5252;
-    --ok: #2e7d32;
-    --accent: #2e7d32;
-  }
-  .dark {
-    --bg: #121212;
-    --fg: #f1f1f1;
-    --card-bg: #1e1e1e;
-    --card-alt: #232323;
-    --border: #3a3a3a;
-    --border-strong: #4a4a4a;
-    --button-bg: #1e1e1e;
-    --button-hover: #2a2a2a;
-    --muted: #a0a0a0;
-    --err: #ff6b6b;
-    --ok: #8bc34a;
-    --accent: #81c784;
-  }
-  html, body { background: var(--bg); color: var(--fg); }
-  body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: clamp(12px, 4vw, 28px); transition: background 0.3s, color 0.3s; font-size: 16px; line-height: 1.5; }
-  header { display:flex; justify-content:space-between; align-items:center; margin-bottom:12px; gap:12px; flex-wrap:wrap; }
-  h1 { margin:0; font-size: clamp(22px, 5vw, 30px); }
-  a.btn, button.btn { text-decoration:none; border:1px solid var(--border); padding:10px 14px; border-radius:var(--radius); background:var(--button-bg); color:var(--fg); cursor:pointer; transition:background 0.2s, border-color 0.2s; min-height:44px; }
-  a.btn:hover, button.btn:hover { background:var(--button-hover); border-color:var(--border-strong); }
-  button { border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); padding:10px 14px; cursor:pointer; transition:background 0.2s, border-color 0.2s; min-height:44px; font-size:16px; touch-action: manipulation; -webkit-tap-highlight-color: transparent; }
-  button:hover { background:var(--button-hover); border-color:var(--border-strong); }
-  .card { border:1px solid var(--border); border-radius:var(--radius); padding:16px; margin:12px 0; background:var(--card-bg); transition:background 0.2s, border-color 0.2s; }
+  .card { border:1px solid var(--border); border-radius:var(--radius); padding:16px; margin:12px 0; background:var(--card-bg); content-visibility:auto; contain-intrinsic-size:auto 260px; }
   .row { display:flex; gap:12px; align-items:center; flex-wrap:wrap; }
-  select, input[type="number"], input[type="text"] { padding:10px 12px; border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); transition:background 0.2s, border-color 0.2s; font-size:16px; min-height:44px; width:auto; max-width:100%; }
+  select, input[type="number"], input[type="text"] { padding:10px 12px; border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); font-size:16px; min-height:44px; width:auto; max-width:100%; }
   select:hover, button:hover, input[type="text"]:hover, input[type="number"]:hover { border-color:var(--border-strong); }
   input[type="range"] { accent-color: var(--accent); width:min(360px,100%); }
   button, input, select { font-size:16px; }
   .hint { font-size:12px; color:var(--muted); }
-  pre { background:var(--card-alt); padding:12px; border-radius:var(--radius); overflow:auto; border:1px solid var(--border); transition:background 0.2s, border-color 0.2s; }
+  pre { background:var(--card-alt); padding:12px; border-radius:var(--radius); overflow:auto; border:1px solid var(--border); }
   .ok { color:var(--ok); }
   .err { color:var(--err); font-weight:600; }
   label { min-width: 200px; display:inline-block; }
@@ -1261,8 +2345,8 @@ PAGE_SETTINGS = """<!doctype html>
     <div class="row">
       <label for="devSel">Gerät:</label>
       <select id="devSel"></select>
-      <button id="applyDev">Übernehmen</button>
-      <button id="testTone">▶ Testton</button>
+      <button id="applyDev" data-action="applyDev">Übernehmen</button>
+      <button id="testTone" data-action="testTone">▶ Testton</button>
     </div>
     <p class="hint">mpg123 gibt direkt an ALSA: <code>-o alsa -a &lt;gerät&gt;</code> (z. B. <code>plughw:1,0</code> für USB).</p>
     <p class="hint">Aktuell: <code id="curDev"></code> | Mixer-Karte: <code id="curCard"></code></p>
@@ -1274,7 +2358,7 @@ PAGE_SETTINGS = """<!doctype html>
     <div class="row">
       <input id="vol" type="range" min="0" max="100" step="1" />
       <strong id="volLabel">– %</strong>
-      <button id="muteBtn">Mute</button>
+      <button id="muteBtn" data-action="muteBtn">Mute</button>
       <span class="hint" id="ctlHint"></span>
     </div>
   </div>
@@ -1284,11 +2368,24 @@ PAGE_SETTINGS = """<!doctype html>
     <div class="row">
       <label for="syncLead">Vorlauf (ms):</label>
       <input id="syncLead" type="number" min="0" max="500" step="10" />
-      <button id="saveSync">Speichern</button>
+      <button id="saveSync" data-action="saveSync">Speichern</button>
       <span class="hint" id="syncMsg"></span>
     </div>
   </div>
 
+  <div class="card">
+    <h3>Servo-Filter</h3>
+    <div class="row">
+      <label for="servoDeadband">Totband (µs):</label>
+      <input id="servoDeadband" type="number" min="0" max="200" step="1" />
+      <label for="servoInterval">Mindestabstand (ms):</label>
+      <input id="servoInterval" type="number" min="0" max="100" step="1" />
+      <button id="saveServoFilter" data-action="saveServoFilter">Speichern</button>
+      <span class="hint" id="servoFilterMsg"></span>
+    </div>
+    <div class="hint">Weniger Servo-Updates: kleine Änderungen und zu schnelle Folgen werden übersprungen (weniger Zittern, weniger Last für pigpio).</div>
+  </div>
+
   <div class="card">
     <h3>Winkel (Mund zu/auf)</h3>
     <div class="row">
@@ -1300,7 +2397,7 @@ PAGE_SETTINGS = """<!doctype html>
       <input id="openAngle" type="number" min="0" max="180" step="1" />
     </div>
     <div class="row">
-      <button id="saveAngles">Speichern</button>
+      <button id="saveAngles" data-action="saveAngles">Speichern</button>
       <span class="hint" id="anglesMsg"></span>
     </div>
   </div>
@@ -1316,7 +2413,7 @@ PAGE_SETTINGS = """<!doctype html>
       <select id="powerGpioSel"></select>
     </div>
     <div class="row">
-      <button id="saveGpio">Speichern</button>
+      <button id="saveGpio" data-action="saveGpio">Speichern</button>
       <span class="hint" id="gpioMsg"></span>
     </div>
     <p class="hint">„None“ deaktiviert die jeweilige Funktion – dann werden nur MP3s abgespielt.</p>
@@ -1329,7 +2426,7 @@ PAGE_SETTINGS = """<!doctype html>
       <input id="soundboardTitle" type="text" placeholder="{{ default_title|e }}" style="min-width:360px;" maxlength="160" />
     </div>
     <div class="row">
-      <button id="saveTitle">Speichern</button>
+      <button id="saveTitle" data-action="saveTitle">Speichern</button>
       <span class="hint" id="titleMsg"></span>
     </div>
   </div>
@@ -1345,7 +2442,7 @@ PAGE_SETTINGS = """<!doctype html>
       <input id="configPath" type="text" placeholder="/opt/configs/web_soundboard_config.json" style="min-width:360px;" />
     </div>
     <div class="row">
-      <button id="savePaths">Speichern</button>
+      <button id="savePaths" data-action="savePaths">Speichern</button>
       <span class="hint" id="pathsMsg"></span>
     </div>
   </div>
@@ -1354,8 +2451,8 @@ PAGE_SETTINGS = """<!doctype html>
     <h3>Kategorien</h3>
     <div class="row">
       <label for="newCategory">Neue Kategorie:</label>
-      <input id="newCategory" type="text" placeholder="z. B. Jingles" />
-      <button id="addCategoryBtn">➕ Hinzufügen</button>
+      <input id="newCategory" type="text" data-enter-action="addCategory" placeholder="z. B. Jingles" />
+      <button id="addCategoryBtn" data-action="addCategory">➕ Hinzufügen</button>
     </div>
     <p class="hint" id="categoryListHint">Noch keine Kategorien vorhanden.</p>
     <ul class="category-list" id="categoryList" aria-live="polite"></ul>
@@ -1377,67 +2474,53 @@ PAGE_SETTINGS = """<!doctype html>
 
   <div class="card">
     <h3>Letzter Fehler</h3>
-    <pre id="lastErr"></pre>
-  </div>
-
-  <div class="card">
-    <h3>Debug (aplay -l)</h3>
-    <pre id="dbg"></pre>
-  </div>
-
-<script>
-const themeToggle=document.getElementById('themeToggle');
-const root=document.documentElement;
-
-function setTheme(theme, store=true){
-  root.classList.toggle('dark', theme === 'dark');
-  root.dataset.theme = theme;
-  if(store){
-    try{ localStorage.setItem('theme', theme); }catch(e){}
-  }
-  if(themeToggle){ themeToggle.textContent = theme === 'dark' ? '☀️ Hell' : '🌙 Dunkel'; }
-}
+    <pre id="lastErr"></pre>
+  </div>
 
-function initTheme(){
-  let theme = 'light';
-  try{
-    const stored = localStorage.getItem('theme');
-    if(stored){ theme = stored; }
-    else if(window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches){
-      theme = 'dark';
-    }
-  }catch(e){}
-  setTheme(theme, false);
-}
+  <div class="card">
+    <h3>Debug (aplay -l)</h3>
+    <pre id="dbg"></pre>
+  </div>
 
-initTheme();
-if(themeToggle){
-  themeToggle.addEventListener('click', ()=>{
-    const next = root.classList.contains('dark') ? 'light' : 'dark';
-    setTheme(next);
-  });
-}
-if(window.matchMedia){
-  try{
-    const mm = window.matchMedia('(prefers-color-scheme: dark)');
-    const handler = (ev)=>{
-      try{ if(localStorage.getItem('theme')) return; }catch(e){}
-      setTheme(ev.matches ? 'dark' : 'light', false);
-    };
-    if(typeof mm.addEventListener === 'function') mm.addEventListener('change', handler);
-    else if(typeof mm.addListener === 'function') mm.addListener(handler);
-  }catch(e){}
+<script src="{{ asset_url('theme.js') }}"></script>
+<script>
+// Beim Verlassen der Seite laufende Anfragen abbrechen; nach Rückkehr aus dem
+// bfcache gibt es einen frischen Controller
+let PAGE_AC=new AbortController();
+window.addEventListener('pagehide', ()=>PAGE_AC.abort());
+window.addEventListener('pageshow', (ev)=>{ if(ev.persisted) PAGE_AC=new AbortController(); });
+function pageSignal(sig){ if(!sig) return PAGE_AC.signal; return AbortSignal.any ? AbortSignal.any([sig, PAGE_AC.signal]) : sig; }
+// HTML-Fehlerseiten (z. B. 502 vom Proxy) und leere Antworten gar nicht erst als JSON parsen
+async function fetchJSON(u, opt){ opt=Object.assign({}, opt); if(opt.method && opt.method!=='GET') swrClear(); opt.signal=pageSignal(opt.signal); const r=await fetch(u, opt); if(!(r.headers.get('content-type')||'').includes('application/json')){ if(!r.ok) throw new Error(`HTTP ${r.status}`); return {}; } const j=await r.json(); if(!r.ok) throw new Error(j.error||`HTTP ${r.status}`); return j; }
+// Kurzzeit-Cache in sessionStorage (stale-while-revalidate): höchstens 5 s alte
+// Antworten sofort zeichnen und im Hintergrund auffrischen; jedes POST leert ihn
+const SWR_TTL_MS=5000;
+function swrClear(){ try{ for(const k of Object.keys(sessionStorage)) if(k.startsWith('cache:')) sessionStorage.removeItem(k); }catch(e){} }
+function swrStore(k, j){ try{ sessionStorage.setItem(k, JSON.stringify({t:Date.now(), j})); }catch(e){} }
+async function swrJSON(url, render, force=false){
+  const k='cache:'+url;
+  if(!force){
+    let hit=null;
+    try{ const raw=sessionStorage.getItem(k); if(raw) hit=JSON.parse(raw); }catch(e){}
+    if(hit && Date.now()-hit.t<SWR_TTL_MS){
+      render(hit.j);
+      fetchJSON(url).then(fresh=>{ swrStore(k, fresh); render(fresh); }).catch(()=>{});
+      return;
+    }
+  }
+  const j=await fetchJSON(url);
+  swrStore(k, j);
+  render(j);
 }
-
-async function fetchJSON(u, opt){ const r=await fetch(u, opt||{}); const j=await r.json(); if(!r.ok) throw new Error(j.error||'Fehler'); return j; }
-const devSel=document.getElementById('devSel'), applyDev=document.getElementById('applyDev'), testTone=document.getElementById('testTone');
+const devSel=document.getElementById('devSel');
 const curDev=document.getElementById('curDev'), curCard=document.getElementById('curCard'), vol=document.getElementById('vol'), volLabel=document.getElementById('volLabel'), muteBtn=document.getElementById('muteBtn'), ctlHint=document.getElementById('ctlHint');
-const syncLead=document.getElementById('syncLead'), saveSync=document.getElementById('saveSync'), syncMsg=document.getElementById('syncMsg');
-const closedAngle=document.getElementById('closedAngle'), openAngle=document.getElementById('openAngle'), saveAngles=document.getElementById('saveAngles'), anglesMsg=document.getElementById('anglesMsg');
-const servoGpioSel=document.getElementById('servoGpioSel'), powerGpioSel=document.getElementById('powerGpioSel'), saveGpio=document.getElementById('saveGpio'), gpioMsg=document.getElementById('gpioMsg');
-const soundboardTitle=document.getElementById('soundboardTitle'), saveTitle=document.getElementById('saveTitle'), titleMsg=document.getElementById('titleMsg');
-const soundDir=document.getElementById('soundDir'), configPath=document.getElementById('configPath'), savePaths=document.getElementById('savePaths'), pathsMsg=document.getElementById('pathsMsg');
-const newCategory=document.getElementById('newCategory'), addCategoryBtn=document.getElementById('addCategoryBtn');
+const syncLead=document.getElementById('syncLead'), syncMsg=document.getElementById('syncMsg');
+const servoDeadband=document.getElementById('servoDeadband'), servoInterval=document.getElementById('servoInterval'), servoFilterMsg=document.getElementById('servoFilterMsg');
+const closedAngle=document.getElementById('closedAngle'), openAngle=document.getElementById('openAngle'), anglesMsg=document.getElementById('anglesMsg');
+const servoGpioSel=document.getElementById('servoGpioSel'), powerGpioSel=document.getElementById('powerGpioSel'), gpioMsg=document.getElementById('gpioMsg');
+const soundboardTitle=document.getElementById('soundboardTitle'), titleMsg=document.getElementById('titleMsg');
+const soundDir=document.getElementById('soundDir'), configPath=document.getElementById('configPath'), pathsMsg=document.getElementById('pathsMsg');
+const newCategory=document.getElementById('newCategory');
 const categoryListHint=document.getElementById('categoryListHint'), categoryMsg=document.getElementById('categoryMsg'), categoryList=document.getElementById('categoryList');
 const dbg=document.getElementById('dbg'), lastErr=document.getElementById('lastErr'), devMsg=document.getElementById('devMsg');
 let currentCategories=[];
@@ -1447,21 +2530,43 @@ const saveMp3CommandsBtn=document.getElementById('saveMp3Commands');
 const mp3CommandMsg=document.getElementById('mp3CommandMsg');
 let availableMp3Files=[];
 
+// ein Collator für alle Sortierungen statt localeCompare mit Optionen je Vergleich
+const CAT_COLLATOR=new Intl.Collator('de',{sensitivity:'base'});
 function sanitizeCategories(list){
   const out=[];
   if(Array.isArray(list)){
+    const seen=new Set();
     for(const raw of list){
       if(typeof raw!== 'string') continue;
       const trimmed=raw.trim();
       if(!trimmed) continue;
-      if(out.some(existing=>existing.toLowerCase()===trimmed.toLowerCase())) continue;
+      const key=trimmed.toLowerCase();
+      if(seen.has(key)) continue;
+      seen.add(key);
       out.push(trimmed);
     }
   }
-  out.sort((a,b)=>a.localeCompare(b,'de',{sensitivity:'base'}));
+  out.sort(CAT_COLLATOR.compare);
   return out;
 }
 
+const categoryPills=new Map();
+function makeCategoryPill(cat){
+  const li=document.createElement('li');
+  li.className='category-pill';
+  const label=document.createElement('span');
+  label.textContent=cat;
+  li.appendChild(label);
+  const btn=document.createElement('button');
+  btn.type='button';
+  btn.className='tagDelete';
+  btn.dataset.category=cat;
+  btn.setAttribute('aria-label', `Kategorie "${cat}" löschen`);
+  btn.textContent='✖';
+  li.appendChild(btn);
+  return li;
+}
+
 function renderCategoryList(){
   if(categoryListHint){
     if(!currentCategories.length){
@@ -1471,45 +2576,34 @@ function renderCategoryList(){
     }
   }
   if(!categoryList) return;
-  categoryList.innerHTML='';
+  // nur den Unterschied anfassen: Pills je Name merken, entfernte löschen,
+  // neue an der sortierten Stelle einfügen, vorhandene bleiben stehen
+  const wanted=new Set(currentCategories);
+  for(const [cat, li] of categoryPills){
+    if(!wanted.has(cat)){ li.remove(); categoryPills.delete(cat); }
+  }
+  let next=categoryList.firstChild;
   for(const cat of currentCategories){
-    const li=document.createElement('li');
-    li.className='category-pill';
-    const label=document.createElement('span');
-    label.textContent=cat;
-    li.appendChild(label);
-    const btn=document.createElement('button');
-    btn.type='button';
-    btn.className='tagDelete';
-    btn.dataset.category=cat;
-    btn.setAttribute('aria-label', `Kategorie "${cat}" löschen`);
-    btn.textContent='✖';
-    li.appendChild(btn);
-    categoryList.appendChild(li);
+    let li=categoryPills.get(cat);
+    if(!li){ li=makeCategoryPill(cat); categoryPills.set(cat, li); }
+    if(li===next) next=next.nextSibling;
+    else categoryList.insertBefore(li, next);
   }
 }
 
-function setCategoryStatus(text, ok){
-  if(!categoryMsg) return;
-  if(!text){ categoryMsg.textContent=''; categoryMsg.className='hint'; return; }
-  categoryMsg.textContent=text;
-  if(ok === undefined){
-    categoryMsg.className='hint';
-  }else{
-    categoryMsg.className='hint ' + (ok ? 'ok' : 'err');
-  }
+// Hinweiszeile setzen; unveränderter Text/Klasse fasst das DOM nicht an
+function setMsg(el, text, ok){
+  if(!el) return;
+  text=text||'';
+  const cls=(!text || ok===undefined) ? 'hint' : 'hint ' + (ok ? 'ok' : 'err');
+  if(el.textContent===text && el.className===cls) return;
+  el.textContent=text;
+  el.className=cls;
 }
 
-function setMp3CommandStatus(text, ok){
-  if(!mp3CommandMsg) return;
-  if(!text){ mp3CommandMsg.textContent=''; mp3CommandMsg.className='hint'; return; }
-  mp3CommandMsg.textContent=text;
-  if(ok === undefined){
-    mp3CommandMsg.className='hint';
-  }else{
-    mp3CommandMsg.className='hint ' + (ok ? 'ok' : 'err');
-  }
-}
+function setCategoryStatus(text, ok){ setMsg(categoryMsg, text, ok); }
+
+function setMp3CommandStatus(text, ok){ setMsg(mp3CommandMsg, text, ok); }
 
 function displayLabelForFile(file){
   if(!file) return '';
@@ -1656,13 +2750,13 @@ async function loadMp3CommandConfig(){
 async function loadCategoriesCard(){
   if(!categoryListHint) return;
   try{
-    const res=await fetch('/categories');
-    const j=await res.json();
-    if(!res.ok || !j.ok) throw new Error(j.error||'Kategorien konnten nicht geladen werden');
+    const j=await fetchJSON('/categories');
+    if(!j.ok) throw new Error(j.error||'Kategorien konnten nicht geladen werden');
     currentCategories=sanitizeCategories(j.categories||[]);
     renderCategoryList();
     setCategoryStatus('');
   }catch(e){
+    if(e.name==='AbortError') return;
     setCategoryStatus(e.message||'Kategorien konnten nicht geladen werden', false);
   }
 }
@@ -1726,22 +2820,32 @@ if(mp3CommandRows){
   mp3CommandRows.addEventListener('input', ()=>{ setMp3CommandStatus(''); });
 }
 
-function fillGpioSelect(sel, value){ sel.innerHTML=""; const opts=[null,2,3,4,5,6,7,8,9,10,11,12,13,16,17,18,19,20,21,22,23,24,25,26,27]; for(const v of opts){ const o=document.createElement('option'); o.value=(v===null)?"None":String(v); o.textContent=(v===null)?"None":String(v); if((value===null&&v===null)||(value!==null&&String(value)===String(v))) o.selected=true; sel.appendChild(o);} }
+const GPIO_OPTS=Object.freeze([null,2,3,4,5,6,7,8,9,10,11,12,13,16,17,18,19,20,21,22,23,24,25,26,27]);
+// Optionen einmal bauen, je Select nur klonen
+const gpioOptionsTpl=(()=>{ const frag=document.createDocumentFragment(); for(const v of GPIO_OPTS){ const o=document.createElement('option'); o.value=(v===null)?"None":String(v); o.textContent=o.value; frag.appendChild(o); } return frag; })();
+function fillGpioSelect(sel, value){ if(!sel.dataset.filled){ sel.replaceChildren(gpioOptionsTpl.cloneNode(true)); sel.dataset.filled='1'; } sel.selectedIndex=Math.max(0, GPIO_OPTS.indexOf((value===undefined||value===null)?null:Number(value))); }
 
-async function loadDevices(){ const j=await fetchJSON('/devices'); devSel.innerHTML=""; for(const d of j.devices){ const o=document.createElement('option'); o.value=d.value; o.textContent=d.label; if(j.current && j.current.alsa_device===d.value) o.selected=true; devSel.appendChild(o);} curDev.textContent=(j.current&&j.current.alsa_device)||"–"; curCard.textContent=(j.current&&(""+j.current.alsa_card_index))||"–"; dbg.textContent=j.debug||""; }
+function escHTML(s){ return String(s).replace(/[&<>"']/g, c=>({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c])); }
+// Optionen nur neu bauen, wenn sich die Geräteliste geändert hat (sonst nur die Auswahl setzen)
+let devicesKey=null;
+function renderDevices(j){ const cur=j.current && j.current.alsa_device; const key=JSON.stringify(j.devices); if(key!==devicesKey){ const html=j.devices.map(d=>`<option value="${escHTML(d.value)}"${d.value===cur?' selected':''}>${escHTML(d.label)}</option>`).join(''); devSel.replaceChildren(); devSel.insertAdjacentHTML('beforeend', html); devicesKey=key; }else{ const i=j.devices.findIndex(d=>d.value===cur); if(i>=0) devSel.selectedIndex=i; } curDev.textContent=(j.current&&j.current.alsa_device)||"–"; curCard.textContent=(j.current&&(""+j.current.alsa_card_index))||"–"; dbg.textContent=j.debug||""; }
+function loadDevices(force=false){ return swrJSON('/devices', renderDevices, force); }
 
-applyDev.onclick=async()=>{ devMsg.textContent=""; try{ const j=await fetchJSON('/device',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({alsa_device:devSel.value})}); devMsg.textContent="Gerät übernommen: "+j.alsa_device+" (Karte "+j.alsa_card_index+")"; devMsg.className="hint ok"; await loadDevices(); await loadVol(); }catch(e){ devMsg.textContent=e.message; devMsg.className="hint err"; } };
+const actions={};
+actions.applyDev=async()=>{ devMsg.textContent=""; try{ const j=await fetchJSON('/device',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({alsa_device:devSel.value})}); devMsg.textContent="Gerät übernommen: "+j.alsa_device+" (Karte "+j.alsa_card_index+")"; devMsg.className="hint ok"; await loadDevices(true); await loadVol(); }catch(e){ devMsg.textContent=e.message; devMsg.className="hint err"; } };
 
-testTone.onclick=async()=>{ devMsg.textContent="Testton…"; const r=await fetch('/test-tone',{method:'POST'}); const j=await r.json(); if(!j.ok){ devMsg.textContent=j.error||"Fehler"; devMsg.className="hint err"; }else{ devMsg.textContent=j.message||"ok"; devMsg.className="hint ok"; } };
+actions.testTone=async()=>{ devMsg.textContent="Testton…"; try{ const j=await fetchJSON('/test-tone',{method:'POST'}); if(!j.ok) throw new Error(j.error||"Fehler"); devMsg.textContent=j.message||"ok"; devMsg.className="hint ok"; }catch(e){ if(e.name==='AbortError') return; devMsg.textContent=e.message||"Fehler"; devMsg.className="hint err"; } };
 
-async function loadVol(){ const r=await fetch('/volume'); const j=await r.json(); if(!r.ok){ alert(j.error||"Fehler Lautstärke"); return; } vol.value=j.volume??0; volLabel.textContent=(j.volume??0)+" %"; muteBtn.textContent=j.muted?"Unmute":"Mute"; ctlHint.textContent=j.control?("Mixer: "+j.control+" (Karte "+(j.card??"?")+")"):""; }
-let debounce; vol.oninput=()=>{ volLabel.textContent=vol.value+" %"; clearTimeout(debounce); debounce=setTimeout(async()=>{ await fetchJSON('/volume',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({volume:parseInt(vol.value,10)})}); },120); };
-muteBtn.onclick=async()=>{ const j=await fetchJSON('/volume',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({toggle_mute:true})}); muteBtn.textContent=j.muted?"Unmute":"Mute"; if(typeof j.volume==='number'){ vol.value=j.volume; volLabel.textContent=j.volume+" %"; } };
+async function loadVol(){ let j; try{ j=await fetchJSON('/volume'); }catch(e){ if(e.name!=='AbortError') alert(e.message||"Fehler Lautstärke"); return; } vol.value=j.volume??0; volLabel.textContent=(j.volume??0)+" %"; muteBtn.textContent=j.muted?"Unmute":"Mute"; ctlHint.textContent=j.control?("Mixer: "+j.control+" (Karte "+(j.card??"?")+")"):""; }
+// nur der letzte Reglerwert zählt: laufende Anfrage abbrechen, sobald ein neuer Wert kommt
+let debounce, volCtl=null; vol.addEventListener('input', ()=>{ volLabel.textContent=vol.value+" %"; clearTimeout(debounce); debounce=setTimeout(async()=>{ if(volCtl) volCtl.abort(); const ctl=volCtl=new AbortController(); try{ await fetchJSON('/volume',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({volume:parseInt(vol.value,10)}),signal:ctl.signal}); }catch(e){ if(e.name!=='AbortError') console.error(e); }finally{ if(volCtl===ctl) volCtl=null; } },80); }, {passive:true});
+actions.muteBtn=async()=>{ const j=await fetchJSON('/volume',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({toggle_mute:true})}); muteBtn.textContent=j.muted?"Unmute":"Mute"; if(typeof j.volume==='number'){ vol.value=j.volume; volLabel.textContent=j.volume+" %"; } };
 
-saveSync.onclick=async()=>{ try{ const val=parseInt(syncLead.value,10); const j=await fetchJSON('/sync',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({sync_lead_ms:val})}); syncMsg.textContent="Vorlauf: "+j.sync_lead_ms+" ms"; syncMsg.className="hint ok"; }catch(e){ syncMsg.textContent=e.message; syncMsg.className="hint err"; } };
-saveAngles.onclick=async()=>{ try{ const ca=parseInt(closedAngle.value,10), oa=parseInt(openAngle.value,10); const j=await fetchJSON('/angles',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({closed_angle:ca,open_angle:oa})}); anglesMsg.textContent="CLOSED="+j.closed_angle+"°, OPEN="+j.open_angle+"°"; anglesMsg.className="hint ok"; }catch(e){ anglesMsg.textContent=e.message; anglesMsg.className="hint err"; } };
-saveGpio.onclick=async()=>{ function parse(v){ if(!v||v.toLowerCase()==="none") return null; const n=parseInt(v,10); return isNaN(n)?null:n; } try{ const j=await fetchJSON('/gpio',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({servo_gpio:parse(servoGpioSel.value),power_gpio:parse(powerGpioSel.value)})}); gpioMsg.textContent="Servo="+(j.servo_gpio===null?"None":j.servo_gpio)+", Power="+(j.power_gpio===null?"None":j.power_gpio); gpioMsg.className="hint ok"; }catch(e){ gpioMsg.textContent=e.message; gpioMsg.className="hint err"; } };
-savePaths.onclick=async()=>{
+actions.saveSync=async()=>{ try{ const val=parseInt(syncLead.value,10); const j=await fetchJSON('/sync',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({sync_lead_ms:val})}); syncMsg.textContent="Vorlauf: "+j.sync_lead_ms+" ms"; syncMsg.className="hint ok"; }catch(e){ syncMsg.textContent=e.message; syncMsg.className="hint err"; } };
+actions.saveServoFilter=async()=>{ try{ const db=parseInt(servoDeadband.value,10), iv=parseInt(servoInterval.value,10); const j=await fetchJSON('/servo-filter',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({servo_deadband_us:db,servo_min_interval_ms:iv})}); servoFilterMsg.textContent="Totband "+j.servo_deadband_us+" µs, Abstand "+j.servo_min_interval_ms+" ms"; servoFilterMsg.className="hint ok"; }catch(e){ servoFilterMsg.textContent=e.message; servoFilterMsg.className="hint err"; } };
+actions.saveAngles=async()=>{ try{ const ca=parseInt(closedAngle.value,10), oa=parseInt(openAngle.value,10); const j=await fetchJSON('/angles',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({closed_angle:ca,open_angle:oa})}); anglesMsg.textContent="CLOSED="+j.closed_angle+"°, OPEN="+j.open_angle+"°"; anglesMsg.className="hint ok"; }catch(e){ anglesMsg.textContent=e.message; anglesMsg.className="hint err"; } };
+actions.saveGpio=async()=>{ function parse(v){ if(!v||v.toLowerCase()==="none") return null; const n=parseInt(v,10); return isNaN(n)?null:n; } try{ const j=await fetchJSON('/gpio',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({servo_gpio:parse(servoGpioSel.value),power_gpio:parse(powerGpioSel.value)})}); gpioMsg.textContent="Servo="+(j.servo_gpio===null?"None":j.servo_gpio)+", Power="+(j.power_gpio===null?"None":j.power_gpio); gpioMsg.className="hint ok"; }catch(e){ gpioMsg.textContent=e.message; gpioMsg.className="hint err"; } };
+actions.savePaths=async()=>{
   try{
     const body={};
     if(soundDir.value.trim()) body.sound_dir=soundDir.value.trim();
@@ -1755,8 +2859,8 @@ savePaths.onclick=async()=>{
   }
 };
 
-if(saveTitle) saveTitle.onclick=async()=>{
-  if(titleMsg){ titleMsg.textContent=''; titleMsg.className='hint'; }
+actions.saveTitle=async()=>{
+  setMsg(titleMsg, '');
   try{
     const body={ title: soundboardTitle ? soundboardTitle.value.trim() : '' };
     const j=await fetchJSON('/soundboard-title',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(body)});
@@ -1767,7 +2871,7 @@ if(saveTitle) saveTitle.onclick=async()=>{
   }
 };
 
-if(addCategoryBtn) addCategoryBtn.onclick=async()=>{
+actions.addCategory=async()=>{
   if(!newCategory) return;
   const name=newCategory.value.trim();
   if(!name){ setCategoryStatus('Bitte Namen eingeben', false); newCategory.focus(); return; }
@@ -1782,11 +2886,35 @@ if(addCategoryBtn) addCategoryBtn.onclick=async()=>{
     setCategoryStatus(e.message||'Kategorie konnte nicht gespeichert werden', false);
   }
 };
-if(newCategory) newCategory.addEventListener('keydown', (ev)=>{ if(ev.key==='Enter'){ ev.preventDefault(); if(addCategoryBtn) addCategoryBtn.click(); } });
+
+// ein Klick- und ein Enter-Handler für alle Aktionsknöpfe (data-action bzw. data-enter-action)
+document.body.addEventListener('click', (ev)=>{
+  const el=ev.target.closest('[data-action]');
+  const fn=el && actions[el.dataset.action];
+  if(fn) fn(ev);
+});
+document.body.addEventListener('keydown', (ev)=>{
+  if(ev.key!=='Enter') return;
+  const el=ev.target.closest('[data-enter-action]');
+  const fn=el && actions[el.dataset.enterAction];
+  if(fn){ ev.preventDefault(); fn(ev); }
+});
 
 async function loadLastError(){ const j=await fetchJSON('/last-error'); lastErr.textContent=(j.ts?("["+j.ts+"] "):"")+(j.msg||"—"); }
-async function loadAppConfig(){ const j=await fetchJSON('/app-config'); syncLead.value=j.sync_lead_ms??180; closedAngle.value=j.closed_angle??5; openAngle.value=j.open_angle??65; function fill(sel,val){ sel.innerHTML=""; const opts=[null,2,3,4,5,6,7,8,9,10,11,12,13,16,17,18,19,20,21,22,23,24,25,26,27]; for(const v of opts){ const o=document.createElement('option'); o.value=(v===null)?"None":String(v); o.textContent=o.value; if((val===null&&v===null)||(val!==null&&String(val)===String(v))) o.selected=true; sel.appendChild(o); } } fill(servoGpioSel,j.servo_gpio??null); fill(powerGpioSel,j.power_gpio??null); if(soundboardTitle) soundboardTitle.value=j.soundboard_title||''; if(titleMsg){ titleMsg.textContent=''; titleMsg.className='hint'; } soundDir.value=j.sound_dir||""; configPath.value=j.config_path||""; }
-window.addEventListener('DOMContentLoaded', async ()=>{ await loadDevices(); await loadVol(); await loadLastError(); await loadAppConfig(); await loadMp3CommandConfig(); await loadCategoriesCard(); });
+function renderAppConfig(j){ syncLead.value=j.sync_lead_ms??180; servoDeadband.value=j.servo_deadband_us??15; servoInterval.value=j.servo_min_interval_ms??15; closedAngle.value=j.closed_angle??5; openAngle.value=j.open_angle??65; fillGpioSelect(servoGpioSel,j.servo_gpio??null); fillGpioSelect(powerGpioSel,j.power_gpio??null); if(soundboardTitle) soundboardTitle.value=j.soundboard_title||''; setMsg(titleMsg, ''); soundDir.value=j.sound_dir||""; configPath.value=j.config_path||""; }
+function loadAppConfig(){ return swrJSON('/app-config', renderAppConfig); }
+window.addEventListener('DOMContentLoaded', ()=>{
+  // die Karten sind unabhängig: parallel laden, ein Fehler bricht die anderen nicht ab
+  const logErr=(e)=>console.error(e);
+  return Promise.all([
+    loadDevices().catch(e=>{ devMsg.textContent=e.message||"Geräte konnten nicht geladen werden"; devMsg.className="hint err"; }),
+    loadVol().catch(logErr),
+    loadLastError().catch(logErr),
+    loadAppConfig().catch(logErr),
+    loadMp3CommandConfig().catch(logErr),
+    loadCategoriesCard().catch(logErr),
+  ]);
+});
 </script>
 </body>
 </html>
@@ -1800,60 +2928,29 @@ PAGE_LIVE = """<!doctype html>
 <script>
 (function(){
   try{
+    // eine MediaQueryList für die ganze Seite (Theme-Init und Change-Listener)
+    const mql = window.__mqlDark = window.matchMedia ? window.matchMedia('(prefers-color-scheme: dark)') : null;
     const stored = localStorage.getItem('theme');
-    const prefersDark = window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches;
+    const prefersDark = !!(mql && mql.matches);
     const theme = stored || (prefersDark ? 'dark' : 'light');
     const root = document.documentElement;
     root.classList.toggle('dark', theme === 'dark');
     root.dataset.theme = theme;
+    // einmal gelesen, der Rest der Seite nutzt diesen Wert
+    window.__themePref = {stored, theme};
   }catch(e){}
 })();
 </script>
+<link rel="stylesheet" href="{{ asset_url('soundboard.css') }}">
 <style>
-  *, *::before, *::after { box-sizing: border-box; }
-  :root {
-    --radius: 14px;
-    --bg: #fafafa;
-    --fg: #111;
-    --card-bg: #ffffff;
-    --card-alt: #f0f0f0;
-    --border: #d8d8d8;
-    --border-strong: #c0c0c0;
-    --button-bg: #ffffff;
-    --button-hover: #f0f0f0;
-    --muted: #666666;
-    --err: #ff5252;
-    --ok: #2e7d32;
-    --accent: #2e7d32;
-  }
-  .dark {
-    --bg: #121212;
-    --fg: #f1f1f1;
-    --card-bg: #1e1e1e;
-    --card-alt: #232323;
-    --border: #3a3a3a;
-    --border-strong: #4a4a4a;
-    --button-bg: #1e1e1e;
-    --button-hover: #2a2a2a;
-    --muted: #a0a0a0;
-    --err: #ff6b6b;
-    --ok: #8bc34a;
-    --accent: #81c784;
-  }
-  html, body { background: var(--bg); color: var(--fg); }
-  body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: clamp(12px, 4vw, 28px); transition: background 0.3s, color 0.3s; font-size: 16px; line-height: 1.5; }
-  header { display:flex; justify-content:space-between; align-items:center; margin-bottom:12px; gap:12px; flex-wrap:wrap; }
-  h1 { margin:0; font-size: clamp(22px, 5vw, 30px); }
-  a.btn, button.btn { text-decoration:none; border:1px solid var(--border); padding:10px 14px; border-radius:var(--radius); background:var(--button-bg); color:var(--fg); cursor:pointer; transition:background 0.2s, border-color 0.2s; min-height:44px; }
-  a.btn:hover, button.btn:hover { background:var(--button-hover); border-color:var(--border-strong); }
-  button { border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); padding:10px 14px; cursor:pointer; transition:background 0.2s, border-color 0.2s; min-height:44px; font-size:16px; touch-action: manipulation; -webkit-tap-highlight-color: transparent; }
-  button:hover { background:var(--button-hover); border-color:var(--border-strong); }
-  .card { border:1px solid var(--border); border-radius:var(--radius); padding:16px; margin:12px 0; background:var(--card-bg); transition:background 0.2s, border-color 0.2s; }
+  .card { border:1px solid var(--border); border-radius:var(--radius); padding:16px; margin:12px 0; background:var(--card-bg); }
   .row { display:flex; gap:12px; align-items:center; flex-wrap:wrap; }
-  select, input[type="number"], input[type="text"] { padding:10px 12px; border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); transition:background 0.2s, border-color 0.2s; font-size:16px; min-height:44px; width:auto; max-width:100%; }
+  select, input[type="number"], input[type="text"] { padding:10px 12px; border:1px solid var(--border); border-radius:var(--radius); background:var(--button-bg); color:var(--fg); font-size:16px; min-height:44px; width:auto; max-width:100%; }
   select:hover, input[type="number"]:hover, input[type="text"]:hover { border-color:var(--border-strong); }
+  input[type="range"] { accent-color: var(--accent); width:min(220px,100%); }
+  output { min-width:5.5em; font-variant-numeric:tabular-nums; }
   .hint { font-size:12px; color:var(--muted); }
-  pre { background:var(--card-alt); padding:12px; border-radius:var(--radius); overflow:auto; max-height:260px; border:1px solid var(--border); transition:background 0.2s, border-color 0.2s; }
+  pre { background:var(--card-alt); padding:12px; border-radius:var(--radius); overflow:auto; max-height:260px; border:1px solid var(--border); }
   .ok { color:var(--ok); } .err { color:var(--err); font-weight:600; }
   label { min-width: 200px; display:inline-block; }
   @media (hover: none) {
@@ -1910,16 +3007,21 @@ PAGE_LIVE = """<!doctype html>
       <label>Ultra-Low-Latency:</label><select id="ull"></select>
     </div>
     <div class="row">
-      <label>Input-Gain (dB):</label><select id="inGain"></select>
-      <label>Output-Gain (dB):</label><select id="outGain"></select>
+      <label>Input-Gain (dB):</label><input type="range" id="inGain" min="-12" max="12" step="1" list="dbTicks" data-unit=" dB"><output for="inGain"></output>
+      <label>Output-Gain (dB):</label><input type="range" id="outGain" min="-12" max="12" step="1" list="dbTicks" data-unit=" dB"><output for="outGain"></output>
     </div>
     <div class="row">
-      <button id="saveNormalBtn">Einstellungen speichern</button>
+      <span class="hint">Änderungen werden automatisch gespeichert.</span>
       <span id="normalMsg" class="hint"></span>
     </div>
   </div>
 
-  <div class="card" id="fxCard" style="display:none">
+  <datalist id="dbTicks"><option value="-12"></option><option value="-6"></option><option value="0"></option><option value="6"></option><option value="12"></option></datalist>
+  <datalist id="reverbTicks"><option value="0"></option><option value="10"></option><option value="18"></option><option value="25"></option><option value="35"></option><option value="45"></option></datalist>
+  <datalist id="servoDelayTicks"><option value="0"></option><option value="100"></option><option value="200"></option><option value="300"></option><option value="400"></option></datalist>
+
+  <div class="card" id="fxCard" hidden></div>
+  <template id="fxCardTpl">
     <h3>Verzerrer (SoX)</h3>
     <div class="row">
       <label>Mikro (Input-Gerät):</label>
@@ -1953,20 +3055,20 @@ PAGE_LIVE = """<!doctype html>
       <label>Ultra-Low-Latency:</label><select id="ullFx"></select>
     </div>
     <div class="row">
-      <label>Pitch (Halbtöne):</label><select id="pitch"></select>
-      <label>Reverb:</label><select id="reverb"></select>
-      <label>Bass (dB):</label><select id="bass"></select>
-      <label>Treble (dB):</label><select id="treble"></select>
+      <label>Pitch (Halbtöne):</label><input type="range" id="pitch" min="-12" max="12" step="1" list="dbTicks" data-unit=" Halbton"><output for="pitch"></output>
+      <label>Reverb:</label><input type="range" id="reverb" min="0" max="45" step="1" list="reverbTicks" data-unit=""><output for="reverb"></output>
+      <label>Bass (dB):</label><input type="range" id="bass" min="-12" max="12" step="1" list="dbTicks" data-unit=" dB"><output for="bass"></output>
+      <label>Treble (dB):</label><input type="range" id="treble" min="-12" max="12" step="1" list="dbTicks" data-unit=" dB"><output for="treble"></output>
     </div>
     <div class="row">
-      <label>Servo-Delay (ms):</label><select id="servoDelay"></select>
+      <label>Servo-Delay (ms):</label><input type="range" id="servoDelay" min="0" max="400" step="10" list="servoDelayTicks" data-unit=" ms"><output for="servoDelay"></output>
       <span class="hint">typisch 120–220 ms</span>
     </div>
     <div class="row">
-      <button id="saveFxBtn">Einstellungen speichern</button>
+      <span class="hint">Änderungen werden automatisch gespeichert.</span>
       <span id="fxMsg" class="hint"></span>
     </div>
-  </div>
+  </template>
 
   <div class="card">
     <div class="row">
@@ -1977,110 +3079,199 @@ PAGE_LIVE = """<!doctype html>
     <div class="row"><pre id="logBox"></pre></div>
   </div>
 
+<script src="{{ asset_url('theme.js') }}"></script>
 <script>
-const themeToggle=document.getElementById('themeToggle');
-const root=document.documentElement;
-
-function setTheme(theme, store=true){
-  root.classList.toggle('dark', theme === 'dark');
-  root.dataset.theme = theme;
-  if(store){
-    try{ localStorage.setItem('theme', theme); }catch(e){}
-  }
-  if(themeToggle){ themeToggle.textContent = theme === 'dark' ? '☀️ Hell' : '🌙 Dunkel'; }
+function escHTML(s){ return String(s).replace(/[&<>"']/g, c=>({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c])); }
+// Optionen als ein HTML-String: ein einziger DOM-Eingriff statt appendChild je Eintrag
+function optionsHTML(items, selectedVal){
+  const sv=(selectedVal===null||selectedVal===undefined) ? null : String(selectedVal);
+  return items.map(([v,t])=>'<option value="'+escHTML(v)+'"'+(String(v)===sv?' selected':'')+'>'+escHTML(t)+'</option>').join('');
 }
-
-function initTheme(){
-  let theme = 'light';
-  try{
-    const stored = localStorage.getItem('theme');
-    if(stored){ theme = stored; }
-    else if(window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches){
-      theme = 'dark';
-    }
-  }catch(e){}
-  setTheme(theme, false);
+function selFill(sel, values, stringify=(v)=>String(v), label=(v)=>String(v), selectedVal=null){
+  sel.innerHTML = optionsHTML(values.map(v=>[stringify(v), label(v)]), selectedVal);
 }
-
-initTheme();
-if(themeToggle){
-  themeToggle.addEventListener('click', ()=>{
-    const next = root.classList.contains('dark') ? 'light' : 'dark';
-    setTheme(next);
+// FX-Karte erst einhängen und füllen, wenn der Modus gewählt wird
+let liveCfg=null, paDevs=null, alsaDevs=null;
+function mountFxCard(){
+  const card=document.getElementById('fxCard');
+  if(card.firstElementChild || !liveCfg || !paDevs) return;
+  card.appendChild(document.getElementById('fxCardTpl').content.cloneNode(true));
+  renderDevs(null, null);
+  fillFxSets(liveCfg);
+  document.getElementById('applyPresetBtn').addEventListener('click', ()=>{
+    const name = document.getElementById('presetSel').value;
+    applyPreset(name);
+    saveFields('fx', [...PRESET_IDS, 'presetSel']);
   });
 }
-if(window.matchMedia){
-  try{
-    const mm = window.matchMedia('(prefers-color-scheme: dark)');
-    const handler = (ev)=>{
-      try{ if(localStorage.getItem('theme')) return; }catch(e){}
-      setTheme(ev.matches ? 'dark' : 'light', false);
-    };
-    if(typeof mm.addEventListener === 'function') mm.addEventListener('change', handler);
-    else if(typeof mm.addListener === 'function') mm.addListener(handler);
-  }catch(e){}
-}
-
-function selFill(sel, values, stringify=(v)=>String(v), label=(v)=>String(v), selectedVal=null){
-  sel.innerHTML = "";
-  for(const v of values){
-    const o = document.createElement('option');
-    o.value = stringify(v);
-    o.textContent = label(v);
-    if(selectedVal!==null && String(selectedVal)===String(o.value)) o.selected = true;
-    sel.appendChild(o);
-  }
-}
 function showMode(){
   const m=document.getElementById('modeSel').value;
+  if(m==='fx') mountFxCard();
   document.getElementById('normalCard').style.display = (m==='normal')?'block':'none';
-  document.getElementById('fxCard').style.display = (m==='fx')?'block':'none';
+  document.getElementById('fxCard').hidden = (m!=='fx');
 }
 document.getElementById('modeSel').addEventListener('change', showMode);
 
-async function jget(u){ const r=await fetch(u); const j=await r.json(); if(!r.ok) throw new Error(j.error||'Fehler'); return j; }
-async function jpost(u,body){ const r=await fetch(u,{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(body||{})}); const j=await r.json(); if(!r.ok) throw new Error(j.error||'Fehler'); return j; }
-
+// Ein noch laufendes GET auf dieselbe URL ist durch das neue überholt -> abbrechen
+const HTTP={ ctrls:new Map(), get:{'Accept':'application/json'}, post:{'Accept':'application/json','Content-Type':'application/json'} };
+// Kleiner LRU vor jget: nur Antworten mit max-age (ohne no-cache/no-store) landen darin
+class LRU{
+  constructor(n){ this.n=n; this.m=new Map(); }
+  get(k){ const v=this.m.get(k); if(v!==undefined){ this.m.delete(k); this.m.set(k,v); } return v; }
+  set(k,v){ if(this.m.has(k)) this.m.delete(k); else if(this.m.size>=this.n) this.m.delete(this.m.keys().next().value); this.m.set(k,v); }
+  clear(){ this.m.clear(); }
+}
+const GET_CACHE=new LRU(64);
+function maxAgeMs(r){
+  const cc=r.headers.get('Cache-Control')||'';
+  if(/no-cache|no-store/.test(cc)) return 0;
+  const m=/max-age=(\\d+)/.exec(cc); return m ? parseInt(m[1],10)*1000 : 0;
+}
+async function jget(u){
+  const hit=GET_CACHE.get(u);
+  if(hit && hit.expires>Date.now()) return hit.body;
+  const prev=HTTP.ctrls.get(u); if(prev) prev.abort();
+  const c=new AbortController(); HTTP.ctrls.set(u,c);
+  try{
+    const r=await fetch(u,{signal:c.signal, headers:HTTP.get}); const j=await r.json(); if(!r.ok) throw new Error(j.error||'Fehler');
+    const age=maxAgeMs(r); if(age) GET_CACHE.set(u, {expires:Date.now()+age, body:j});
+    return j;
+  }
+  finally{ if(HTTP.ctrls.get(u)===c) HTTP.ctrls.delete(u); }
+}
+// jede Änderung kann zwischengespeicherte GETs veralten lassen
+async function jpost(u,body){ const r=await fetch(u,{method:'POST',headers:HTTP.post,body:JSON.stringify(body||{})}); const j=await r.json(); if(!r.ok) throw new Error(j.error||'Fehler'); GET_CACHE.clear(); return j; }
+
+// Änderungen an /live-config sammeln: mehrere Speichern-Klicks kurz hintereinander
+// ergeben einen POST (und einen Schreibvorgang der Konfig auf dem Server)
+class BatchedConfigSaver{
+  constructor(url, delayMs=200, maxBatch=10){ this.url=url; this.delayMs=delayMs; this.maxBatch=maxBatch; this.inflight=Promise.resolve(); this._reset(); }
+  _reset(){ this.pending={normal:{}, fx:{}}; this.waiters=[]; this.count=0; this.timer=null; }
+  save(body){
+    const p=this.pending;
+    if(body.mode) p.mode=body.mode;
+    if(body.normal) Object.assign(p.normal, body.normal);
+    if(body.fx) Object.assign(p.fx, body.fx);
+    const done=new Promise((resolve,reject)=>this.waiters.push({resolve,reject}));
+    clearTimeout(this.timer);
+    if(++this.count>=this.maxBatch) this.flush().catch(()=>{});
+    else this.timer=setTimeout(()=>this.flush().catch(()=>{}), this.delayMs);
+    return done;
+  }
+  // sendet Ausstehendes; das Ergebnis steht erst fest, wenn auch ein schon laufender POST fertig ist
+  flush(){
+    clearTimeout(this.timer);
+    if(!this.count) return this.inflight;
+    const {pending, waiters}=this; this._reset();
+    if(!Object.keys(pending.normal).length) delete pending.normal;
+    if(!Object.keys(pending.fx).length) delete pending.fx;
+    this.inflight=this.inflight.catch(()=>{}).then(()=>jpost(this.url, pending)).then(
+      j=>{ for(const w of waiters) w.resolve(j); return j; },
+      e=>{ for(const w of waiters) w.reject(e); throw e; });
+    return this.inflight;
+  }
+}
+const cfgSaver=new BatchedConfigSaver('/live-config');
+
+// Gerätelisten (PortAudio/ALSA-Abfrage ist langsam) in localStorage zwischenspeichern:
+// frische Kopie sofort zeichnen, im Hintergrund neu laden und nur bei Änderung neu aufbauen
+const DEV_TTL_MS=15000;
+function cacheGet(u){ try{ return JSON.parse(localStorage.getItem('cache:'+u)); }catch(e){ return null; } }
+function cachePut(u,data){ try{ localStorage.setItem('cache:'+u, JSON.stringify({ts:Date.now(), data})); }catch(e){} }
+function cacheBust(){ try{ for(const k of Object.keys(localStorage)) if(k.startsWith('cache:')) localStorage.removeItem(k); }catch(e){} }
+async function cachedJget(u, ttlMs=DEV_TTL_MS, onFresh=null){
+  const hit=cacheGet(u);
+  const fresh=jget(u).then(data=>{ cachePut(u,data); return data; });
+  if(hit && Date.now()-hit.ts<ttlMs){
+    fresh.then(data=>{ if(onFresh && JSON.stringify(data)!==JSON.stringify(hit.data)) onFresh(data); }).catch(()=>{});
+    return hit.data;
+  }
+  return fresh;
+}
+// Optionen nur ersetzen, wenn sich die Liste geändert hat; die aktuelle Auswahl bleibt erhalten
+// HTML je Geräteliste einmal bauen (ohne selected) und für alle Selects dieser Liste
+// verwenden; die Auswahl wird danach über value gesetzt
+const DEV_HTML={};
+function devList(name, items){
+  const key=JSON.stringify(items), hit=DEV_HTML[name];
+  if(hit && hit.key===key) return hit;
+  return DEV_HTML[name]={key, html:optionsHTML(items, null)};
+}
+function fillDevSelect(sel, list, selectedVal){
+  if(sel.dataset.key===list.key) return;
+  const cur=sel.dataset.key ? sel.value : (selectedVal===null||selectedVal===undefined ? null : String(selectedVal));
+  sel.innerHTML=list.html;
+  sel.value=cur;
+  if(sel.selectedIndex<0) sel.selectedIndex=0;
+  sel.dataset.key=list.key;
+}
+const paItems=(list)=>list.map(d=>[String(d.index), `[${d.index}] ${d.name} (${d.api})`]);
+function renderDevs(pa, alsa){
+  if(pa) paDevs=pa;
+  if(alsa) alsaDevs=alsa;
+  const lc=liveCfg;
+  if(!lc) return;   // erst mit Konfig zeichnen, sonst fehlt die gespeicherte Auswahl
+  const fxMounted=!!document.getElementById('fxCard').firstElementChild;
+  if(paDevs){
+    const ins=devList('in', paItems(paDevs.inputs));
+    fillDevSelect(document.getElementById('inDev'), ins, lc.normal.input_device);
+    fillDevSelect(document.getElementById('outDev'), devList('out', paItems(paDevs.outputs)), lc.normal.output_device);
+    if(fxMounted) fillDevSelect(document.getElementById('inDevFx'), ins, lc.fx.input_device);
+  }
+  if(fxMounted && alsaDevs) fillDevSelect(document.getElementById('alsaOut'), devList('alsa', alsaDevs.devices.map(d=>[d.value, d.label])), lc.fx.alsa_out);
+}
+function fetchDevs(){
+  return Promise.all([
+    cachedJget('/pa-devices', DEV_TTL_MS, d=>renderDevs(d, null)),
+    cachedJget('/devices', DEV_TTL_MS, d=>renderDevs(null, d)),
+  ]);
+}
 async function loadDevs(){
-  const pa=await jget('/pa-devices');
-  const alsa=await jget('/devices');
-  const inSel = document.getElementById('inDev'), outSel = document.getElementById('outDev');
-  const inFx  = document.getElementById('inDevFx'), alsaOut = document.getElementById('alsaOut');
-  inSel.innerHTML=outSel.innerHTML=inFx.innerHTML=alsaOut.innerHTML="";
-  for(const d of pa.inputs){ const o=document.createElement('option'); o.value=d.index; o.textContent=`[${d.index}] ${d.name} (${d.api})`; inSel.appendChild(o); inFx.appendChild(o.cloneNode(true)); }
-  for(const d of pa.outputs){ const o=document.createElement('option'); o.value=d.index; o.textContent=`[${d.index}] ${d.name} (${d.api})`; outSel.appendChild(o); }
-  for(const d of alsa.devices){ const o=document.createElement('option'); o.value=d.value; o.textContent=d.label; alsaOut.appendChild(o); }
+  const [pa, alsa]=await fetchDevs();
+  renderDevs(pa, alsa);
 }
+// Nach längerer Zeit im Hintergrund könnten Geräte an- oder abgesteckt worden sein
+let hiddenAt=0;
+document.addEventListener('visibilitychange', ()=>{
+  if(document.hidden){ hiddenAt=Date.now(); return; }
+  if(hiddenAt && Date.now()-hiddenAt>60000){ cacheBust(); loadDevs().catch(()=>{}); }
+});
 
+// Feste Auswahllisten einmal anlegen statt bei jedem Füllen neu zu erzeugen
+const SR_LIST=Object.freeze([32000,44100,48000,88200,96000]);
+const BS_LIST=Object.freeze([32,64,96,128,160,192,256,384,512,1024]);
+const SOX_LIST=Object.freeze([64,96,128,160,192,256,384,512,768,1024,1536,2048]);
+const ONOFF_LIST=Object.freeze([{v:"0",t:"aus"},{v:"1",t:"an"}]);
+// Regler statt langer Auswahllisten; der Wert steht im <output> daneben
+function showRange(el){ el.nextElementSibling.value = el.value + el.dataset.unit; }
+function setRange(id, v){ const el=document.getElementById(id); el.value=String(v); showRange(el); }
+document.addEventListener('input', e=>{ if(e.target.type==='range' && e.target.dataset.unit!==undefined) showRange(e.target); }, {passive:true});
 function fillDropdownSets(lc){
   // Normal
-  selFill(document.getElementById('sr'), [32000,44100,48000,88200,96000], String, String, lc.normal.samplerate);
-  selFill(document.getElementById('bs'), [32,64,96,128,160,192,256,384,512,1024], String, String, lc.normal.blocksize);
-  selFill(document.getElementById('ull'), [{v:"0",t:"aus"},{v:"1",t:"an"}], x=>x.v, x=>x.t, lc.normal.ultra_low_latency?"1":"0");
-  const dbrange=[]; for(let i=-12;i<=12;i++) dbrange.push(i);
-  selFill(document.getElementById('inGain'), dbrange, String, v=>v+" dB", Math.round(lc.normal.input_gain_db));
-  selFill(document.getElementById('outGain'), dbrange, String, v=>v+" dB", Math.round(lc.normal.output_gain_db));
-
-  // FX
-  selFill(document.getElementById('srFx'), [32000,44100,48000,88200,96000], String, String, lc.fx.samplerate);
-  selFill(document.getElementById('bsFx'), [32,64,96,128,160,192,256,384,512,1024], String, String, lc.fx.blocksize);
-  selFill(document.getElementById('soxBuf'), [64,96,128,160,192,256,384,512,768,1024,1536,2048], String, String, lc.fx.sox_buffer_frames);
-  selFill(document.getElementById('ullFx'), [{v:"0",t:"aus"},{v:"1",t:"an"}], x=>x.v, x=>x.t, lc.fx.ultra_low_latency?"1":"0");
-  const pitch=[]; for(let i=-12;i<=12;i++) pitch.push(i);
-  selFill(document.getElementById('pitch'), pitch, String, v=>v+" Halbton", Math.round(lc.fx.fx_pitch_semitones));
-  const reverb=[0,5,8,10,12,15,18,25,35,45];
-  selFill(document.getElementById('reverb'), reverb, String, v=>v, Math.round(lc.fx.fx_reverb));
-  const dbrange2=[]; for(let i=-12;i<=12;i++) dbrange2.push(i);
-  selFill(document.getElementById('bass'), dbrange2, String, v=>v+" dB", Math.round(lc.fx.fx_bass_db));
-  selFill(document.getElementById('treble'), dbrange2, String, v=>v+" dB", Math.round(lc.fx.fx_treble_db));
-  const sDel=[]; for(let i=0;i<=400;i+=10) sDel.push(i);
-  selFill(document.getElementById('servoDelay'), sDel, String, v=>v, Math.round(lc.fx.servo_delay_ms||0));
+  selFill(document.getElementById('sr'), SR_LIST, String, String, lc.normal.samplerate);
+  selFill(document.getElementById('bs'), BS_LIST, String, String, lc.normal.blocksize);
+  selFill(document.getElementById('ull'), ONOFF_LIST, x=>x.v, x=>x.t, lc.normal.ultra_low_latency?"1":"0");
+  setRange('inGain', Math.round(lc.normal.input_gain_db));
+  setRange('outGain', Math.round(lc.normal.output_gain_db));
 
   document.getElementById('modeSel').value = lc.mode || "fx";
+}
+
+function fillFxSets(lc){
+  selFill(document.getElementById('srFx'), SR_LIST, String, String, lc.fx.samplerate);
+  selFill(document.getElementById('bsFx'), BS_LIST, String, String, lc.fx.blocksize);
+  selFill(document.getElementById('soxBuf'), SOX_LIST, String, String, lc.fx.sox_buffer_frames);
+  selFill(document.getElementById('ullFx'), ONOFF_LIST, x=>x.v, x=>x.t, lc.fx.ultra_low_latency?"1":"0");
+  setRange('pitch', Math.round(lc.fx.fx_pitch_semitones));
+  setRange('reverb', Math.round(lc.fx.fx_reverb));
+  setRange('bass', Math.round(lc.fx.fx_bass_db));
+  setRange('treble', Math.round(lc.fx.fx_treble_db));
+  setRange('servoDelay', Math.round(lc.fx.servo_delay_ms||0));
+
   document.getElementById('presetSel').value = lc.fx.preset || "neutral";
 }
 
-const PRESETS = {
+const PRESETS = Object.freeze({
   neutral: { pitch: 0,   reverb: 0,  bass: 0,  treble: 0 },
   daemon:  { pitch: -8,  reverb: 18, bass: 6,  treble: -2 },
   monster: { pitch: -12, reverb: 12, bass: 9,  treble: -3 },
@@ -2088,128 +3279,113 @@ const PRESETS = {
   helium:  { pitch: +7,  reverb: 8,  bass: -3, treble: +5 },
   funky:   { pitch: +3,  reverb: 10, bass: 2,  treble: +6 },
   whisper: { pitch: 0,   reverb: 45, bass: -6, treble: 2 }
-};
+});
+const PRESET_IDS = ['pitch','reverb','bass','treble'];
+// Regler erst nach dem Einhängen der FX-Karte vorhanden -> beim ersten Preset auflösen
+let PRESET_FIELDS = null;
 function applyPreset(name){
   const p = PRESETS[name] || PRESETS.neutral;
-  document.getElementById('pitch').value = String(p.pitch);
-  document.getElementById('reverb').value = String(p.reverb);
-  document.getElementById('bass').value = String(p.bass);
-  document.getElementById('treble').value = String(p.treble);
-}
-document.getElementById('applyPresetBtn').addEventListener('click', ()=>{
-  const name = document.getElementById('presetSel').value;
-  applyPreset(name);
-});
-
+  if(!PRESET_FIELDS) PRESET_FIELDS = PRESET_IDS.map(id=>[id, document.getElementById(id)]);
+  for(const [k, el] of PRESET_FIELDS){ el.value = String(p[k]); showRange(el); }
+}
+// Konfig und beide Gerätelisten in einer Antwort (/bootstrap) statt drei Anfragen;
+// die Gerätelisten landen zugleich im Cache für spätere Aktualisierungen
 async function loadLiveConfig(){
-  const lc=(await jget('/live-config')).live_config;
-  await loadDevs();
-  const inSel=document.getElementById('inDev'), outSel=document.getElementById('outDev'), inFx=document.getElementById('inDevFx'), alsaOut=document.getElementById('alsaOut');
-  if(lc.normal.input_device!==null){ for(const o of inSel.options){ if(String(o.value)===String(lc.normal.input_device)) o.selected=true; } }
-  if(lc.normal.output_device!==null){ for(const o of outSel.options){ if(String(o.value)===String(lc.normal.output_device)) o.selected=true; } }
-  if(lc.fx.input_device!==null){ for(const o of inFx.options){ if(String(o.value)===String(lc.fx.input_device)) o.selected=true; } }
-  for(const o of alsaOut.options){ if(String(o.value)===String(lc.fx.alsa_out)) o.selected=true; }
+  const b=await jget('/bootstrap');
+  for(const part of [b.pa, b.alsa]){ if(!part || part.error) throw new Error((part && part.error) || 'sounddevice nicht installiert'); }
+  cachePut('/pa-devices', b.pa); cachePut('/devices', b.alsa);
+  const lc=liveCfg=b.live_config;
+  renderDevs(b.pa, b.alsa);
   fillDropdownSets(lc);
   showMode();
 }
 
+function renderStatus(j){ document.getElementById('status').textContent = j.stopping ? 'stoppt …' : j.starting ? 'startet …' : j.running ? `läuft (PID ${j.pid}, Modus ${j.mode})` : 'bereit'; }
 async function refreshStatus(){
-  try{ const j=await jget('/live-status'); document.getElementById('status').textContent = j.running ? `läuft (PID ${j.pid}, Modus ${j.mode})` : 'bereit';
+  try{ renderStatus(await jget('/live-status'));
   }catch(e){ document.getElementById('status').textContent='Status: Fehler'; }
 }
+let logCursor=null;
 async function refreshLog(){
-  try{ const j=await jget('/live-log'); document.getElementById('logBox').textContent=(j.log||[]).join("\\n");
+  try{
+    const q=logCursor ? `?since=${logCursor.to}&clears=${logCursor.clears}` : '';
+    const j=await jget('/live-log'+q);
+    appendLog({reset:j.reset, lines:j.log||[]}); logCursor={to:j.to, clears:j.clears};
   }catch(e){}
 }
+// Status und Log kommen per Server-Sent Events; der Server schickt nur neue Zeilen
+// Neue Zeilen als Textknoten anhängen statt das ganze Log neu zu setzen; vorn kürzen
+const LOG_MAX={{ log_lines }};
+const logCounts=[];
+let logTotal=0;
+function appendLog(j){
+  const box=document.getElementById('logBox');
+  if(j.reset){ box.textContent=''; logCounts.length=0; logTotal=0; }
+  if(!j.lines.length) return;
+  box.append(document.createTextNode(j.lines.join("\\n")+"\\n"));
+  logCounts.push(j.lines.length); logTotal+=j.lines.length;
+  while(logTotal-logCounts[0]>=LOG_MAX){ logTotal-=logCounts.shift(); box.firstChild.remove(); }
+}
+function startLiveEvents(){
+  if(!window.EventSource){ refreshStatus(); refreshLog(); setInterval(refreshStatus,1500); setInterval(refreshLog,1500); return; }
+  const es=new EventSource('/live-events');
+  es.addEventListener('status', e=>renderStatus(JSON.parse(e.data)));
+  es.addEventListener('log', e=>appendLog(JSON.parse(e.data)));
+}
 
 document.getElementById('saveModeBtn').onclick = async ()=>{
   try{
     const mode = document.getElementById('modeSel').value;
-    const j = await jpost('/live-config', { mode });
+    await cfgSaver.save({ mode });
     document.getElementById('modeMsg').textContent='Modus gespeichert'; document.getElementById('modeMsg').className='hint ok';
   }catch(e){ document.getElementById('modeMsg').textContent=e.message; document.getElementById('modeMsg').className='hint err'; }
 };
-document.getElementById('saveNormalBtn').onclick = async ()=>{
-  try{
-    const body = {
-      normal: {
-        samplerate: parseInt(document.getElementById('sr').value,10),
-        blocksize:  parseInt(document.getElementById('bs').value,10),
-        input_device: parseInt(document.getElementById('inDev').value,10),
-        output_device: parseInt(document.getElementById('outDev').value,10),
-        input_gain_db: parseFloat(document.getElementById('inGain').value),
-        output_gain_db: parseFloat(document.getElementById('outGain').value),
-        ultra_low_latency: (document.getElementById('ull').value==='1')
-      }
-    };
-    await jpost('/live-config', body);
-    document.getElementById('normalMsg').textContent='Gespeichert'; document.getElementById('normalMsg').className='hint ok';
-  }catch(e){ document.getElementById('normalMsg').textContent=e.message; document.getElementById('normalMsg').className='hint err'; }
+// Feld-ID -> [Konfig-Schlüssel, Parser]; Änderungen speichert ein Listener je Karte
+const asInt=v=>parseInt(v,10), asOn=v=>v==='1';
+const NORMAL_FIELDS={
+  sr:['samplerate',asInt], bs:['blocksize',asInt], inDev:['input_device',asInt], outDev:['output_device',asInt],
+  inGain:['input_gain_db',parseFloat], outGain:['output_gain_db',parseFloat], ull:['ultra_low_latency',asOn]
 };
-document.getElementById('saveFxBtn').onclick = async ()=>{
-  try{
-    const body = {
-      fx: {
-        samplerate: parseInt(document.getElementById('srFx').value,10),
-        blocksize:  parseInt(document.getElementById('bsFx').value,10),
-        input_device: parseInt(document.getElementById('inDevFx').value,10),
-        alsa_out: document.getElementById('alsaOut').value,
-        fx_pitch_semitones: parseFloat(document.getElementById('pitch').value),
-        fx_reverb: parseFloat(document.getElementById('reverb').value),
-        fx_bass_db: parseFloat(document.getElementById('bass').value),
-        fx_treble_db: parseFloat(document.getElementById('treble').value),
-        sox_buffer_frames: parseInt(document.getElementById('soxBuf').value,10),
-        ultra_low_latency: (document.getElementById('ullFx').value==='1'),
-        servo_delay_ms: parseFloat(document.getElementById('servoDelay').value),
-        preset: document.getElementById('presetSel').value
-      }
-    };
-    await jpost('/live-config', body);
-    document.getElementById('fxMsg').textContent='Gespeichert'; document.getElementById('fxMsg').className='hint ok';
-  }catch(e){ document.getElementById('fxMsg').textContent=e.message; document.getElementById('fxMsg').className='hint err'; }
+const FX_FIELDS={
+  srFx:['samplerate',asInt], bsFx:['blocksize',asInt], inDevFx:['input_device',asInt], alsaOut:['alsa_out',String],
+  pitch:['fx_pitch_semitones',parseFloat], reverb:['fx_reverb',parseFloat], bass:['fx_bass_db',parseFloat],
+  treble:['fx_treble_db',parseFloat], soxBuf:['sox_buffer_frames',asInt], ullFx:['ultra_low_latency',asOn],
+  servoDelay:['servo_delay_ms',parseFloat], presetSel:['preset',String]
 };
+const CARD_FIELDS={normal:NORMAL_FIELDS, fx:FX_FIELDS};
+function readFields(fields, ids){
+  const out={};
+  for(const id of ids){ const [key,parse]=fields[id]; out[key]=parse(document.getElementById(id).value); }
+  return out;
+}
+async function saveFields(part, ids){
+  const msg=document.getElementById(part+'Msg');
+  try{
+    await cfgSaver.save({[part]: readFields(CARD_FIELDS[part], ids)});
+    msg.textContent='Gespeichert'; msg.className='hint ok';
+  }catch(e){ msg.textContent=e.message; msg.className='hint err'; }
+}
+for(const part of ['normal','fx']){
+  document.getElementById(part+'Card').addEventListener('change', e=>{
+    if(e.target.id in CARD_FIELDS[part]) saveFields(part, [e.target.id]);
+  });
+}
 
 document.getElementById('startBtn').onclick = async ()=>{
   try{
+    // Werte sind per Autosave schon in der Konfig; der Server liest sie von dort
+    await cfgSaver.flush();
     const mode = document.getElementById('modeSel').value;
-    if(mode==='normal'){
-      const body={
-        mode:'normal',
-        samplerate: parseInt(document.getElementById('sr').value,10),
-        blocksize:  parseInt(document.getElementById('bs').value,10),
-        input_device: parseInt(document.getElementById('inDev').value,10),
-        output_device: parseInt(document.getElementById('outDev').value,10),
-        input_gain_db: parseFloat(document.getElementById('inGain').value),
-        output_gain_db: parseFloat(document.getElementById('outGain').value),
-        ultra_low_latency: document.getElementById('ull').value==='1'
-      };
-      await jpost('/live-start', body);
-    }else{
-      const body={
-        mode:'fx',
-        samplerate: parseInt(document.getElementById('srFx').value,10),
-        blocksize:  parseInt(document.getElementById('bsFx').value,10),
-        input_device: parseInt(document.getElementById('inDevFx').value,10),
-        alsa_out: document.getElementById('alsaOut').value,
-        fx_pitch_semitones: parseFloat(document.getElementById('pitch').value),
-        fx_reverb: parseFloat(document.getElementById('reverb').value),
-        fx_bass_db: parseFloat(document.getElementById('bass').value),
-        fx_treble_db: parseFloat(document.getElementById('treble').value),
-        sox_buffer_frames: parseInt(document.getElementById('soxBuf').value,10),
-        ultra_low_latency: document.getElementById('ullFx').value==='1',
-        servo_delay_ms: parseFloat(document.getElementById('servoDelay').value)
-      };
-      await jpost('/live-start', body);
-    }
-    await refreshStatus(); setTimeout(refreshLog, 300);
+    renderStatus({starting:true});
+    await jpost('/live-start', {mode});
+    if(!window.EventSource) await refreshStatus();
   }catch(e){ alert(e.message); }
 };
-document.getElementById('stopBtn').onclick = async ()=>{ try{ await jpost('/live-stop', {}); await refreshStatus(); }catch(e){ alert(e.message);} };
+document.getElementById('stopBtn').onclick = async ()=>{ try{ renderStatus({stopping:true}); await jpost('/live-stop', {}); if(!window.EventSource) await refreshStatus(); }catch(e){ alert(e.message);} };
 
-window.addEventListener('DOMContentLoaded', async ()=>{
-  await loadLiveConfig();
-  await refreshStatus(); await refreshLog();
-  setInterval(refreshStatus,1500); setInterval(refreshLog,1500);
+window.addEventListener('DOMContentLoaded', ()=>{
+  startLiveEvents();
+  loadLiveConfig().catch(e=>{ document.getElementById('modeMsg').textContent=e.message; document.getElementById('modeMsg').className='hint err'; });
 });
 </script>
 </body>
@@ -2217,40 +3393,146 @@ window.addEventListener('DOMContentLoaded', async ()=>{
 """
 
 # ===== Routes: Pages =====
+# Gemeinsames CSS/JS als eigene Dateien: die URL trägt den Inhalts-Hash, daher
+# darf der Browser sie dauerhaft cachen und beim Seitenwechsel wiederverwenden
+_ASSETS = {}
+for _name, _text, _mimetype in (("soundboard.css", COMMON_CSS, "text/css"),
+                                ("theme.js", THEME_JS, "text/javascript")):
+    _data = _text.encode("utf-8")
+    _ASSETS[_name] = (_data, _mimetype, hashlib.blake2b(_data, digest_size=8).hexdigest())
+
+def asset_url(name):
+    return f"/static/{name}?v={_ASSETS[name][2]}"
+
+app.jinja_env.globals["asset_url"] = asset_url
+
+@app.get("/static/soundboard.css")
+@app.get("/static/theme.js")
+def static_asset():
+    data, mimetype, tag = _ASSETS[request.path.rsplit("/", 1)[1]]
+    resp = Response(data, mimetype=mimetype)
+    resp.set_etag(tag)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 31536000
+    resp.cache_control.immutable = True
+    return resp.make_conditional(request)
+
+# Templates einmal kompilieren statt bei jedem Aufruf neu zu parsen
+_TPL = {name: app.jinja_env.from_string(src) for name, src in
+        (("index", PAGE_INDEX), ("settings", PAGE_SETTINGS), ("live", PAGE_LIVE))}
+
+def render_page(name, **ctx):
+    app.update_template_context(ctx)   # request, config, url_for … wie render_template_string
+    return _TPL[name].render(ctx)
+
+_static_pages = {}
+
+def static_page(name, **ctx):
+    """Seiten ohne veränderlichen Inhalt einmal rendern und als UTF-8 sowie
+    gzip-komprimiert vorhalten; pro Aufruf wird nur noch ausgewählt."""
+    hit = _static_pages.get(name)
+    if hit is None:
+        body = render_page(name, **ctx).encode("utf-8")
+        hit = _static_pages[name] = (body, gzip.compress(body, compresslevel=9))
+    body, gz = hit
+    if request.accept_encodings["gzip"]:
+        resp = Response(gz, mimetype="text/html")
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(body, mimetype="text/html")
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+PAGE_STREAM_CHUNK = 16 * 1024
+
+def stream_page(name, **ctx):
+    """Wie render_page, aber gestreamt: der Browser erhält den Kopf schon,
+    während Jinja noch die Sound-Liste erzeugt. Jinjas kleine Stücke werden
+    zu ~16 KB gebündelt, damit nicht jeder Textknoten ein eigenes write wird."""
+    app.update_template_context(ctx)
+    def _chunks():
+        parts, size = [], 0
+        for piece in _TPL[name].generate(ctx):
+            parts.append(piece)
+            size += len(piece)
+            if size >= PAGE_STREAM_CHUNK:
+                yield "".join(parts)
+                parts, size = [], 0
+        if parts:
+            yield "".join(parts)
+    return Response(stream_with_context(_chunks()), mimetype="text/html")
+
 @app.get("/")
 def index():
-    sounds = list_mp3s()
-    assignments = {s["file"]: s["categories"] for s in sounds if s.get("categories")}
-    return render_template_string(
-        PAGE_INDEX,
-        sounds=sounds,
+    return stream_page(
+        "index",
+        sounds=list_mp3s(),
         categories=cfg.get("categories", []),
-        assignments=assignments,
+        format_duration=format_duration,
         page_title=(cfg.get("soundboard_title") or DEFAULT_TITLE)
     )
 
 @app.get("/settings")
 def settings():
-    return render_template_string(PAGE_SETTINGS, default_title=DEFAULT_TITLE)
+    return static_page("settings", default_title=DEFAULT_TITLE)
 
 @app.get("/live")
 def live_page():
     if not HAVE_SD:
         return "sounddevice (PortAudio) ist nicht installiert. Bitte: pip3 install sounddevice", 500
-    return render_template_string(PAGE_LIVE)
+    return static_page("live", log_lines=LIVE_LOG_LINES)
 
 # ===== Routes: Info/Devices/Volume/Errors/Config/Paths =====
+def etagged(payload, max_age=None):
+    """JSON-Antwort mit ETag über den Inhalt: Unverändertes kostet nur ein 304.
+    Mit max_age darf der Browser die Antwort so viele Sekunden ungefragt nutzen."""
+    body = json_dumps_bytes(payload, indent=False)
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(hashlib.blake2b(body, digest_size=12).hexdigest())
+    resp.cache_control.private = True
+    if max_age:
+        resp.cache_control.max_age = int(max_age)
+    else:
+        # immer revalidieren, damit ein Reload nach einer Änderung nie veraltet ist
+        resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+# JSON (Log, Gerätelisten) komprimiert sich 5–10×; Stufe 1 reicht und kostet kaum CPU.
+# Gestreamte Antworten (SSE, Index-Seite) und schon komprimierte bleiben unverändert.
+GZIP_MIN_BYTES = 512
+GZIP_MIMETYPES = {"application/json", "text/css", "text/javascript"}
+
+@app.after_request
+def gzip_response(resp):
+    if (resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed
+            or resp.mimetype not in GZIP_MIMETYPES or "Content-Encoding" in resp.headers
+            or not request.accept_encodings["gzip"]):
+        return resp
+    data = resp.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return resp
+    resp.set_data(gzip.compress(data, compresslevel=1))
+    resp.headers["Content-Encoding"] = "gzip"
+    resp.vary.add("Accept-Encoding")
+    tag, weak = resp.get_etag()
+    if tag and not weak:
+        resp.set_etag(tag, weak=True)   # andere Bytes als die unkomprimierte Fassung
+    return resp
+
 @app.get("/info")
 def info():
     return jsonify(alsa_device=cfg["alsa_device"], card_index=cfg["alsa_card_index"])
 
-@app.get("/devices")
-def devices_get():
+def _devices_payload():
     devs, raw = aplay_list_devices()
     device_list = [{"label":"default (System)", "value":"default"}] + devs
-    return jsonify(ok=True, devices=device_list,
-                   current={"alsa_device":cfg["alsa_device"], "alsa_card_index":cfg["alsa_card_index"]},
-                   debug=raw)
+    return dict(ok=True, devices=device_list,
+                current={"alsa_device":cfg["alsa_device"], "alsa_card_index":cfg["alsa_card_index"]},
+                debug=raw)
+
+@app.get("/devices")
+def devices_get():
+    return etagged(_devices_payload())
 
 @app.post("/device")
 def device_post():
@@ -2260,6 +3542,8 @@ def device_post():
         return jsonify(error="Parameter 'alsa_device' fehlt"), 400
     cfg["alsa_device"] = alsa
     cfg["alsa_card_index"] = device_to_card_index(alsa)
+    invalidate_mixer_cache()
+    release_alsa_output()   # nächste Wiedergabe öffnet das neue Gerät
     save_config()
     return jsonify(ok=True, alsa_device=cfg["alsa_device"], alsa_card_index=cfg["alsa_card_index"])
 
@@ -2287,6 +3571,8 @@ def upload_mp3():
             try: target.unlink()
             except Exception: pass
         return jsonify(error="Upload fehlgeschlagen."), 500
+    invalidate_mp3_index()   # nicht auf das watchdog-Ereignis warten
+    prewarm_envelopes([target])
     return jsonify(ok=True, file=target.name)
 
 @app.get("/preview/<path:filename>")
@@ -2298,7 +3584,13 @@ def preview_file(filename):
         abort(404)
     if target.suffix.lower() != ".mp3" or not target.is_file() or base not in target.parents:
         abort(404)
-    return send_file(target, mimetype="audio/mpeg", conditional=True)
+    if X_ACCEL_PREFIX:
+        # nginx liefert die Datei selbst aus (internal-Location, sendfile)
+        rel = target.relative_to(base).as_posix()
+        resp = app.response_class(mimetype="audio/mpeg")
+        resp.headers["X-Accel-Redirect"] = X_ACCEL_PREFIX.rstrip("/") + "/" + quote(rel)
+        return resp
+    return send_file(target, mimetype="audio/mpeg", conditional=True, etag=True, max_age=300)
 
 @app.get("/volume")
 def volume_get():
@@ -2337,19 +3629,24 @@ def last_error_get():
 def last_cmd_get():
     return jsonify(cmd=last_cmd.get("text"))
 
+def _app_config_payload():
+    return dict(sync_lead_ms=cfg.get("sync_lead_ms"),
+                servo_gpio=cfg.get("servo_gpio"),
+                power_gpio=cfg.get("power_gpio"),
+                closed_angle=cfg.get("closed_angle"),
+                open_angle=cfg.get("open_angle"),
+                servo_deadband_us=cfg.get("servo_deadband_us"),
+                servo_min_interval_ms=cfg.get("servo_min_interval_ms"),
+                pigpio_connected=bool(HAVE_PIGPIO and pi and pi.connected),
+                gpio_options=GPIO_OPTIONS,
+                sound_dir=str(SOUND_DIR),
+                config_path=str(CONFIG_PATH),
+                alsa_device=cfg.get("alsa_device"),
+                soundboard_title=cfg.get("soundboard_title") or DEFAULT_TITLE)
+
 @app.get("/app-config")
 def app_config_get():
-    return jsonify(sync_lead_ms=cfg.get("sync_lead_ms"),
-                   servo_gpio=cfg.get("servo_gpio"),
-                   power_gpio=cfg.get("power_gpio"),
-                   closed_angle=cfg.get("closed_angle"),
-                   open_angle=cfg.get("open_angle"),
-                   pigpio_connected=bool(HAVE_PIGPIO and pi and pi.connected),
-                   gpio_options=GPIO_OPTIONS,
-                   sound_dir=str(SOUND_DIR),
-                   config_path=str(CONFIG_PATH),
-                   alsa_device=cfg.get("alsa_device"),
-                   soundboard_title=cfg.get("soundboard_title") or DEFAULT_TITLE)
+    return etagged(_app_config_payload())
 
 @app.post("/sync")
 def sync_post():
@@ -2363,6 +3660,20 @@ def sync_post():
     save_config()
     return jsonify(ok=True, sync_lead_ms=cfg["sync_lead_ms"])
 
+@app.post("/servo-filter")
+def servo_filter_post():
+    data = request.get_json(silent=True) or {}
+    try:
+        db = int(data.get("servo_deadband_us"))
+        iv = int(data.get("servo_min_interval_ms"))
+        if not (0 <= db <= 200 and 0 <= iv <= 100): raise ValueError()
+    except Exception:
+        return jsonify(error="Totband 0..200 µs, Mindestabstand 0..100 ms"), 400
+    cfg["servo_deadband_us"] = db
+    cfg["servo_min_interval_ms"] = iv
+    save_config()
+    return jsonify(ok=True, servo_deadband_us=db, servo_min_interval_ms=iv)
+
 @app.post("/angles")
 def angles_post():
     data = request.get_json(silent=True) or {}
@@ -2474,6 +3785,7 @@ def paths_post():
             cfg["sound_dir"] = str(SOUND_DIR)
         except Exception as e:
             return jsonify(error=f"SOUND_DIR ungültig/nicht anlegbar: {e}"), 400
+        start_mp3_watch()
     if new_cp:
         try:
             npth = Path(new_cp).expanduser().resolve()
@@ -2500,7 +3812,7 @@ def _ensure_category_structures():
 @app.get("/categories")
 def categories_get():
     _ensure_category_structures()
-    existing_files = {p.name for p in SOUND_DIR.glob("*.mp3")} | {p.name for p in SOUND_DIR.glob("*.MP3")}
+    existing_files = set(_mp3_names())
     assignments = {}
     removed = []
     for fn, cats in cfg["file_categories"].items():
@@ -2513,7 +3825,7 @@ def categories_get():
         for key in removed:
             cfg["file_categories"].pop(key, None)
         save_config()
-    return jsonify(ok=True, categories=cfg["categories"], assignments=assignments)
+    return etagged({"ok": True, "categories": cfg["categories"], "assignments": assignments})
 
 @app.post("/categories")
 def categories_post():
@@ -2598,26 +3910,48 @@ def file_category_post():
     return jsonify(ok=True, file=fn, categories=cats, category=cats[0] if cats else None)
 
 # ===== PortAudio Devices =====
+def _pa_list_devices():
+    inputs, outputs = [], []
+    sd = get_sd()
+    devs = sd.query_devices()
+    for idx, d in enumerate(devs):
+        api = sd.query_hostapis(d["hostapi"])["name"]
+        ent = {"index": idx, "name": d["name"], "api": api, "in": d["max_input_channels"], "out": d["max_output_channels"]}
+        if d["max_input_channels"] > 0: inputs.append(ent)
+        if d["max_output_channels"] > 0: outputs.append(ent)
+    return dict(ok=True, inputs=inputs, outputs=outputs)
+
+@app.get("/bootstrap")
+def bootstrap():
+    """Alles, was die Live-Seite zum Start braucht, in einer Antwort; die
+    Einzel-Endpunkte bleiben für spätere Aktualisierungen."""
+    pa = None
+    if HAVE_SD:
+        try:
+            pa = _cached("pa", _pa_list_devices)
+        except Exception as e:
+            pa = dict(error=f"Geräteliste fehlgeschlagen: {e}")
+    try:
+        alsa = _devices_payload()
+    except Exception as e:
+        alsa = dict(error=f"Geräteliste fehlgeschlagen: {e}")
+    return etagged(dict(live_config=cfg["live_config"], pa=pa, alsa=alsa, app=_app_config_payload()))
+
 @app.get("/pa-devices")
 def pa_devices():
     if not HAVE_SD:
         return jsonify(error="sounddevice nicht installiert"), 500
-    inputs, outputs = [], []
     try:
-        devs = sd.query_devices()
-        for idx, d in enumerate(devs):
-            api = sd.query_hostapis(d["hostapi"])["name"]
-            ent = {"index": idx, "name": d["name"], "api": api, "in": d["max_input_channels"], "out": d["max_output_channels"]}
-            if d["max_input_channels"] > 0: inputs.append(ent)
-            if d["max_output_channels"] > 0: outputs.append(ent)
+        res = _cached("pa", _pa_list_devices)
     except Exception as e:
         return jsonify(error=f"Geräteliste fehlgeschlagen: {e}"), 500
-    return jsonify(ok=True, inputs=inputs, outputs=outputs)
+    # hängt an keiner Einstellung, nur an der Hardware: so frisch wie der Server-Cache
+    return etagged(res, max_age=DEVICE_CACHE_TTL)
 
 # ===== Live Config (Normal + FX) =====
 @app.get("/live-config")
 def live_config_get():
-    return jsonify(live_config=cfg["live_config"])
+    return etagged(dict(live_config=cfg["live_config"]))
 
 @app.post("/live-config")
 def live_config_post():
@@ -2678,15 +4012,83 @@ def _live_running():
 
 @app.get("/live-status")
 def live_status():
-    p = live_proc.get("p")
-    return jsonify(running=_live_running(), pid=(p.pid if p else None), mode=live_proc.get("mode"))
+    return jsonify(**_live_status_dict())
+
+def _live_log_since(since=None, clears=None):
+    """Zeilen ab Cursor since (Zeilenzähler n). Passt der Cursor nicht mehr (Log
+    geleert oder Zeilen schon aus dem Ring gefallen), kommt das ganze Log mit reset."""
+    with live_cond:
+        n, c = live_seq["n"], live_seq["clears"]
+        reset = since is None or clears != c or not 0 <= n - since <= len(live_log)
+        if reset:
+            lines = list(live_log)
+        else:
+            # nur das Ende des Rings kopieren: O(neue Zeilen) statt O(Log)
+            lines = list(islice(reversed(live_log), n - since))[::-1]
+    return reset, lines, n, c
 
 @app.get("/live-log")
 def live_log_get():
-    return jsonify(log=list(live_log))
-
-@app.post("/live-stop")
-def live_stop():
+    reset, lines, n, c = _live_log_since(request.args.get("since", type=int), request.args.get("clears", type=int))
+    return jsonify(log=lines, reset=reset, to=n, clears=c)
+
+def _live_log_append(line):
+    _live_log_extend((line,))
+
+def _live_log_extend(lines):
+    with live_cond:
+        live_log.extend(lines)
+        live_seq["n"] += len(lines)
+        live_cond.notify_all()
+
+def _live_changed(clear=False):
+    with live_cond:
+        if clear:
+            live_log.clear()
+            live_seq["clears"] += 1
+        live_seq["epoch"] += 1
+        live_cond.notify_all()
+
+def _live_status_dict():
+    p = live_proc.get("p")
+    return dict(running=_live_running(), starting=live_proc["starting"], stopping=live_proc["stopping"], pid=(p.pid if p else None), mode=live_proc.get("mode"))
+
+LIVE_EVENTS_PING_S = 15     # Kommentarzeile hält Proxies wach und erkennt getrennte Clients
+LIVE_EVENTS_MAX_S  = 300    # danach verbindet EventSource neu und gibt den Thread frei
+
+@app.get("/live-events")
+def live_events():
+    """Server-Sent Events statt Polling: 'status' bei Änderungen, 'log' nur mit neuen Zeilen."""
+    def _sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def _gen():
+        yield "retry: 2000\n\n"
+        sent_n = sent_clears = sent_epoch = None
+        status = None
+        end = time.monotonic() + LIVE_EVENTS_MAX_S
+        while time.monotonic() < end:
+            with live_cond:
+                live_cond.wait_for(lambda: live_seq["n"] != sent_n or live_seq["epoch"] != sent_epoch,
+                                   timeout=LIVE_EVENTS_PING_S)
+                epoch = live_seq["epoch"]
+            reset, lines, n, clears = _live_log_since(sent_n, sent_clears)
+            cur = _live_status_dict()
+            out = []
+            if cur != status:
+                status = cur
+                out.append(_sse("status", cur))
+            if reset or lines:
+                out.append(_sse("log", {"reset": reset, "lines": lines}))
+            sent_n, sent_clears, sent_epoch = n, clears, epoch
+            yield "".join(out) or ": ping\n\n"
+
+    resp = Response(stream_with_context(_gen()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+def _live_terminate():
     p = live_proc.get("p")
     if p:
         try:
@@ -2705,16 +4107,72 @@ def live_stop():
     live_proc["p"] = None
     live_proc["mode"] = None
     live_proc["args"] = None
-    live_log.clear()
-    power_off()
-    return jsonify(ok=True, stopped=True)
+    _live_changed(clear=True)
+
+def _live_stop_task():
+    try:
+        _live_terminate()
+        power_off()
+    finally:
+        live_proc["stopping"] = False
+        _live_changed()
+
+# Start und Stopp laufen nacheinander in einem eigenen Thread: fork/exec und das
+# Beenden eines alten Prozesses (bis 1,5 s) halten so keine Anfrage auf
+_live_spawner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-spawn")
+
+def _live_spawn(base_args, mode):
+    try:
+        if _live_running():
+            if live_proc.get("args") == base_args:   # gleiche Parameter: Prozess weiterverwenden
+                return
+            _live_terminate()
+        release_alsa_output()   # Live (SoX bzw. PortAudio) braucht das Gerät exklusiv
+        env = dict(os.environ)
+        env.setdefault("PA_MIN_LATENCY_MSEC", "2")   # PortAudio/ALSA-Mindestpuffer
+        p = subprocess.Popen(base_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0, env=env)
+        live_proc["p"] = p
+        live_proc["mode"] = mode
+        live_proc["args"] = base_args
+        _live_log_append(" ".join(shlex.quote(a) for a in base_args))
+        def _reader():
+            # blockweise lesen: alle bis dahin vollständigen Zeilen landen mit einem
+            # Lock und einem Wecken der Event-Streams im Log statt Zeile für Zeile
+            fd = p.stdout.fileno()
+            buf = b""
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                buf += chunk
+                *lines, buf = buf.split(b"\n")
+                if lines:
+                    _live_log_extend([ln.decode("utf-8", "replace").rstrip() for ln in lines])
+            if buf:
+                _live_log_append(buf.decode("utf-8", "replace").rstrip())
+            p.stdout.close()
+            _live_changed()     # Prozess beendet -> Status neu senden
+        threading.Thread(target=_reader, daemon=True).start()
+    except Exception as e:
+        set_last_error(f"Live-Start fehlgeschlagen: {e}")
+        _live_log_append(f"Start fehlgeschlagen: {e}")
+    finally:
+        live_proc["starting"] = False
+        _live_changed()
+
+@app.post("/live-stop")
+def live_stop():
+    # hinter einem noch ausstehenden Start einreihen, damit er nicht danach startet;
+    # das Ende meldet /live-events bzw. /live-status
+    live_proc["stopping"] = True
+    _live_changed()
+    _live_spawner.submit(_live_stop_task)
+    return jsonify(ok=True, status="stopping"), 202
 
 @app.post("/live-start")
 def live_start():
     if not HAVE_SD:
         return jsonify(error="sounddevice nicht installiert"), 500
-    if _live_running():
-        return jsonify(error="Live läuft bereits – zuerst stoppen"), 409
     data = request.get_json(silent=True) or {}
     mode = data.get("mode") or cfg["live_config"]["mode"]
     if mode not in ("normal","fx"):
@@ -2738,6 +4196,8 @@ def live_start():
     base_args = ["python3", str(Path(__file__).resolve()), "--live",
                  "--closed_angle", str(cfg.get("closed_angle",5)),
                  "--open_angle",   str(cfg.get("open_angle",65)),
+                 "--servo_deadband_us",     str(int(cfg.get("servo_deadband_us", 0))),
+                 "--servo_min_interval_ms", str(cfg.get("servo_min_interval_ms", 0)),
                  "--servo_gpio",   str(cfg.get("servo_gpio")) if cfg.get("servo_gpio") is not None else "None",
                  "--power_gpio",   str(cfg.get("power_gpio")) if cfg.get("power_gpio") is not None else "None"
                  ]
@@ -2793,20 +4253,14 @@ def live_start():
         _append_optional(base_args, "--input_device", input_dev)
         if ull: base_args += ["--ultra_low_latency"]
 
-    try:
-        p = subprocess.Popen(base_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, universal_newlines=True)
-        live_proc["p"] = p
-        live_proc["mode"] = mode
-        live_proc["args"] = base_args
-        live_log.append(" ".join(shlex.quote(a) for a in base_args))
-        def _reader():
-            if p.stdout:
-                for line in p.stdout:
-                    live_log.append(line.rstrip())
-        threading.Thread(target=_reader, daemon=True).start()
-        return jsonify(ok=True, pid=p.pid, mode=mode)
-    except Exception as e:
-        return jsonify(error=f"Start fehlgeschlagen: {e}"), 500
+    # Start im Hintergrund; PID und Erfolg meldet /live-events bzw. /live-status.
+    # Immer über den Worker: nur dort ist die Reihenfolge zu einem noch
+    # ausstehenden Stopp gesichert. Ein laufender Prozess mit gleichen
+    # Parametern (samt SoX-Pipe) bleibt dabei erhalten (siehe _live_spawn).
+    live_proc["starting"] = True
+    _live_changed()
+    _live_spawner.submit(_live_spawn, base_args, mode)
+    return jsonify(ok=True, mode=mode, status="starting"), 202
 
 # ===== Playback Routes =====
 def _get_filename_from_request():
@@ -2821,11 +4275,11 @@ def play():
         return jsonify(error="Parameter 'file' fehlt."), 400
     try:
         path = resolve_file(fn)
-        try:
-            precomputed = compute_envelope(path)
-        except Exception as e:
-            precomputed = None
-            set_last_error(f"Envelope-Berechnung: {e}")
+        # nur aus dem Cache: fehlt die Hüllkurve, streamt der Servo sie
+        # parallel zur Wiedergabe statt den Start zu verzögern
+        precomputed = cached_envelope(path)
+        if precomputed is None and not is_servo_active():
+            prewarm_envelopes([path])
 
         with play_lock:
             stop_current()
@@ -2865,6 +4319,7 @@ def test_tone():
         dev = cfg["alsa_device"] if cfg["alsa_device"] != "default" else None
         args = ["speaker-test", "-t", "sine", "-f", "440", "-l", "1"]
         if dev: args.extend(["-D", dev])
+        release_alsa_output()
         proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=5)
         if proc.returncode == 0:
             return jsonify(ok=True, message="Testton ausgegeben (speaker-test).")
@@ -2877,6 +4332,19 @@ def angle_to_us_local(angle, mn=SERVO_US_MIN, mx=SERVO_US_MAX):
     angle = float(max(0.0, min(180.0, angle)))
     return int(mn + (mx - mn) * (angle/180.0))
 
+def lock_live_memory():
+    # mlockall(MCL_CURRENT): die bis jetzt belegten Seiten bleiben im RAM, der
+    # Audio-Callback wartet nicht auf ausgelagerten Speicher. Bewusst ohne
+    # MCL_FUTURE, sonst zählen spätere Thread-Stacks gegen RLIMIT_MEMLOCK.
+    # Braucht CAP_IPC_LOCK oder ein ausreichendes RLIMIT_MEMLOCK (siehe README).
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if libc.mlockall(1) != 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        print("Speicher gesperrt (mlockall)")
+    except (OSError, AttributeError) as e:
+        print(f"Hinweis: Speicher nicht gesperrt ({e})", file=sys.stderr)
+
 def build_sox_cmd(alsa_out, samplerate, sox_buffer_frames, fx):
     # Ausgabe-Typ ALSA, Zielgerät als Name (z. B. plughw:1,0)
     cmd = [
@@ -2887,8 +4355,96 @@ def build_sox_cmd(alsa_out, samplerate, sox_buffer_frames, fx):
     ] + fx
     return cmd
 
+class PitchShifter:
+    """Phase-Vocoder-Tonhöhenverschiebung im Prozess (statt SoX "pitch").
+    Hann-Fenster der Länge n, Überlappung osamp; Latenz n - n/osamp Samples.
+    process() nimmt beliebig lange float32-Blöcke und liefert gleich viele
+    (mit out= auch in denselben Puffer). Alle Hilfsarrays liegen fest im
+    Objekt; pro Frame legen nur rfft/irfft selbst ein Ergebnis an."""
+    def __init__(self, semitones, n=1024, osamp=4):
+        self.n, self.osamp = n, osamp
+        self.hop = n // osamp
+        self.latency = n - self.hop
+        self.win = np.hanning(n).astype(np.float32)
+        ratio = 2.0 ** (float(semitones) / 12.0)
+        nb = n // 2 + 1
+        self.k = np.arange(nb, dtype=np.float64)
+        self.expct = 2.0 * np.pi * self.hop / n
+        # Ziel-Bin je Quell-Bin (wie smbPitchShift: int(k * ratio))
+        idx = (self.k * ratio).astype(np.int64)
+        self.n_ok = int(np.count_nonzero(idx < nb))   # idx steigt -> gültige Bins am Anfang
+        self.idx = idx[:self.n_ok]
+        self.ratio = ratio
+        self.kexp = self.k * self.expct
+        # Synthesefenster inkl. Normierung (Summe hann² bei 4-facher Überlappung)
+        self.win_s = self.win.astype(np.float64) / 1.5
+        self.last_phase = np.zeros(nb)
+        self.sum_phase = np.zeros(nb)
+        # Scratch je Frame, damit im Audio-Pfad nichts neu angelegt wird
+        self.frame = np.empty(n, dtype=np.float32)
+        self.ph = np.empty(nb); self.mag = np.empty(nb); self.d = np.empty(nb)
+        self.syn_mag = np.empty(nb); self.syn_bin = np.empty(nb)
+        self.bins = np.empty(self.n_ok)
+        self.spec = np.empty(nb, dtype=np.complex128)
+        self.in_fifo = np.zeros(n, dtype=np.float32)
+        self.out_fifo = np.zeros(self.hop, dtype=np.float32)
+        self.out_acc = np.zeros(n, dtype=np.float64)
+        self.rover = self.latency
+
+    def _frame(self):
+        np.multiply(self.in_fifo, self.win, out=self.frame)
+        X = np.fft.rfft(self.frame)
+        mag, ph, d = self.mag, self.ph, self.d
+        np.abs(X, out=mag); np.arctan2(X.imag, X.real, out=ph)
+        np.subtract(ph, self.last_phase, out=d); d -= self.kexp
+        self.last_phase, self.ph = ph, self.last_phase
+        d += np.pi; np.mod(d, 2.0 * np.pi, out=d); d -= np.pi
+        # wahre Frequenz je Bin (in Bins), danach auf die Ziel-Bins verteilen
+        d *= self.osamp / (2.0 * np.pi); d += self.k
+
+        syn_mag, syn_bin, n_ok = self.syn_mag, self.syn_bin, self.n_ok
+        syn_mag.fill(0.0)
+        np.add.at(syn_mag, self.idx, mag[:n_ok])
+        syn_bin.fill(0.0)
+        np.multiply(d[:n_ok], self.ratio, out=self.bins)
+        syn_bin[self.idx] = self.bins
+
+        syn_bin -= self.k; syn_bin *= 2.0 * np.pi / self.osamp; syn_bin += self.kexp
+        self.sum_phase += syn_bin
+        np.mod(self.sum_phase, 2.0 * np.pi, out=self.sum_phase)
+        spec = self.spec
+        np.cos(self.sum_phase, out=spec.real); np.sin(self.sum_phase, out=spec.imag)
+        spec.real *= syn_mag; spec.imag *= syn_mag
+        y = np.fft.irfft(spec, self.n)
+        y *= self.win_s
+        self.out_acc += y
+
+        hop = self.hop
+        self.out_fifo[:] = self.out_acc[:hop]
+        self.out_acc[:-hop] = self.out_acc[hop:]; self.out_acc[-hop:] = 0.0
+        self.in_fifo[:-hop] = self.in_fifo[hop:]
+
+    def process(self, block, out=None):
+        if out is None: out = np.empty(len(block), dtype=np.float32)
+        i, n, lat = 0, self.n, self.latency
+        while i < len(block):
+            m = min(n - self.rover, len(block) - i)
+            r = self.rover
+            self.in_fifo[r:r+m] = block[i:i+m]
+            out[i:i+m] = self.out_fifo[r-lat:r-lat+m]
+            self.rover += m; i += m
+            if self.rover >= n:
+                self.rover = lat
+                self._frame()
+        return out
+
 def live_main(argv):
-    if not HAVE_SD:
+    try:
+        sd = get_sd() if HAVE_SD else None
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sd = None
+    if sd is None:
         print("sounddevice nicht installiert (pip3 install sounddevice)", file=sys.stderr)
         sys.exit(1)
 
@@ -2916,6 +4472,8 @@ def live_main(argv):
     p.add_argument("--power_gpio", type=str, default="None")
     p.add_argument("--closed_angle", type=float, default=5.0)
     p.add_argument("--open_angle",   type=float, default=65.0)
+    p.add_argument("--servo_deadband_us",     type=int,   default=0)
+    p.add_argument("--servo_min_interval_ms", type=float, default=0.0)
 
     args = p.parse_args(argv)
 
@@ -2938,16 +4496,77 @@ def live_main(argv):
 
     # Hüllkurven-Glättung abhängig von blocksize
     frame_ms = 1000.0 * args.blocksize / args.samplerate
-    atk_a = np.exp(-frame_ms / max(1.0, ATTACK_MS))
-    rel_a = np.exp(-frame_ms / max(1.0, RELEASE_MS))
+    atk_a = float(np.exp(-frame_ms / max(1.0, ATTACK_MS)))
+    rel_a = float(np.exp(-frame_ms / max(1.0, RELEASE_MS)))
+    gate = float(10.0 ** (SILENCE_GATE_DBFS / 20.0))
+    # Pulsbreiten der Endstellungen einmal berechnen (ohne int-Rundung, wie
+    # angle_to_us_local mit geklemmtem Winkel), den Rest rechnet der Kernel
+    us_per_deg = (SERVO_US_MAX - SERVO_US_MIN) / 180.0
+    pw_closed = SERVO_US_MIN + us_per_deg * max(0.0, min(180.0, args.closed_angle))
+    pw_open   = SERVO_US_MIN + us_per_deg * max(0.0, min(180.0, args.open_angle))
+    # numba-Version vor dem Stream kompilieren (bzw. aus dem Cache laden),
+    # damit der erste Audio-Callback nicht auf den JIT wartet
+    env_step = _env_step
+    if env_step is not _env_step_py:
+        try:
+            env_step(0.0, 1.0, 0.0, atk_a, rel_a, gate, pw_closed, pw_open)
+        except Exception as e:
+            print(f"[numba] Live-Hüllkurve nicht kompilierbar, nutze Python: {e}", file=sys.stderr)
+            env_step = _env_step_py
+    gain_clip = _gain_clip
+    if gain_clip is not _gain_clip_np:
+        try:
+            gain_clip(np.zeros(4, dtype=np.float32), np.empty(4, dtype=np.float32), np.float32(1.0))
+        except Exception as e:
+            print(f"[numba] Live-Verstärkung nicht kompilierbar, nutze numpy: {e}", file=sys.stderr)
+            gain_clip = _gain_clip_np
+    # Pegel der letzten 2,5 s: hist in Ankunftsreihenfolge, hist_sorted (nur Werte > 0)
+    # sortiert daneben -> Perzentil per Index statt np.percentile je Block;
+    # kein Array-Aufbau (und damit keine float64-Kopie des Fensters) pro Block
     hist = deque(maxlen=max(1, int(2.5 * args.samplerate / args.blocksize)))
+    hist_sorted = []
     y = 0.0
 
-    def set_angle(a):
+    def hist_push(rms):
+        if len(hist) == hist.maxlen:
+            old = hist[0]
+            if old > 0: del hist_sorted[bisect_left(hist_sorted, old)]
+        hist.append(rms)
+        if rms > 0: insort(hist_sorted, rms)
+
+    # Servo-Werte vom Audio-Callback an einen eigenen Thread übergeben,
+    # damit die pigpio-Aufrufe den Callback nicht blockieren
+    servo_ring = EnvRing(256)
+    servo_stop = threading.Event()
+
+    def servo_worker():
+        # nur die jüngste Pulsbreite zählt: nach jedem Schreiben bis zum nächsten
+        # Termin warten, was dazwischen kommt, fasst latest() zu einem Wert zusammen
+        hop = args.blocksize / float(args.samplerate)
+        period = max(args.servo_min_interval_ms / 1000.0, 1.0 / LIVE_SERVO_MAX_HZ)
+        last_pw = int(pw_closed)
+        while not servo_stop.is_set():
+            pw = servo_ring.latest(timeout=max(0.005, 4 * hop))
+            if pw is None: continue
+            pw = int(pw)
+            if abs(pw - last_pw) < args.servo_deadband_us: continue
+            try: pi_local.set_servo_pulsewidth(servo_gpio, pw)
+            except Exception: pass
+            last_pw = pw
+            servo_stop.wait(period)
+
+    def set_pulse(pw):
         if pi_local and servo_gpio is not None:
-            pi_local.set_servo_pulsewidth(servo_gpio, angle_to_us_local(a))
+            servo_ring.put(pw)
+
+    servo_thread = None
+    if pi_local and servo_gpio is not None:
+        servo_thread = threading.Thread(target=servo_worker, daemon=True)
+        servo_thread.start()
 
     def close_out():
+        servo_stop.set(); servo_ring.ev.set()
+        if servo_thread is not None: servo_thread.join(timeout=0.2)
         try:
             if pi_local:
                 if servo_gpio is not None:
@@ -2960,22 +4579,27 @@ def live_main(argv):
             if pi_local: pi_local.stop()
         except Exception: pass
 
-    in_gain  = float(10.0 ** (args.input_gain_db  / 20.0))
-    out_gain = float(10.0 ** (args.output_gain_db / 20.0))
+    in_gain  = np.float32(10.0 ** (args.input_gain_db  / 20.0))
+    out_gain = np.float32(10.0 ** (args.output_gain_db / 20.0))
 
     # Servo-Delay in Blöcken (für FX-Pfad)
     delay_blocks = int(round(max(0.0, args.servo_delay_ms) * args.samplerate / args.blocksize / 1000.0))
-    q_delay = deque(maxlen=delay_blocks if delay_blocks>0 else 1)
+    # Verzögerungsring: ein zusammenhängendes Array statt einer Queue einzelner Blöcke
+    delay = None
+    if args.mode == "fx" and delay_blocks > 0:
+        delay = {"ring": np.empty((delay_blocks, args.blocksize), dtype=np.float32), "idx": 0, "filled": 0}
 
     # SoX vorbereiten (nur Modus fx)
     sox_proc = None
-    sox_proc_failed = False
+    sox_state = {"failed": False}
+    shifter = None
     if args.mode == "fx":
         if not args.alsa_out:
             print("Mit Modus fx bitte --alsa_out angeben (z.B. plughw:1,0).", file=sys.stderr); close_out(); sys.exit(3)
-        cents = args.fx_pitch_semitones * 100.0
+        # Tonhöhe per Phase-Vocoder im Prozess, SoX macht nur noch Hall/EQ
+        if abs(args.fx_pitch_semitones) > 0.0001:
+            shifter = PitchShifter(args.fx_pitch_semitones)
         fx = []
-        if abs(cents) > 0.01: fx += ["pitch", f"{cents:.1f}"]
         if args.fx_reverb > 0.0:   fx += ["reverb", f"{args.fx_reverb:.1f}"]
         if abs(args.fx_bass_db) > 0.01:   fx += ["bass", f"{args.fx_bass_db:+.1f}"]
         if abs(args.fx_treble_db) > 0.01: fx += ["treble", f"{args.fx_treble_db:+.1f}"]
@@ -2991,56 +4615,140 @@ def live_main(argv):
         except FileNotFoundError:
             print("SoX fehlt: sudo apt-get install -y sox libsox-fmt-alsa", file=sys.stderr); close_out(); sys.exit(4)
 
+    # Callback -> SoX über einen eigenen Schreib-Thread: die Pipe kann bei
+    # reverb & Co. stocken, das darf den Audio-Callback nicht blockieren.
+    # Die Blöcke liegen in festen Slots; die Queue trägt nur Zeilen-Views.
+    # Der Schreiber sammelt sox_batch Blöcke und gibt sie mit einem writev()
+    # aus (weniger Syscalls); er hält also bis zu sox_batch Slots zusätzlich.
+    sox_batch = max(1, int(round(LIVE_SOX_COALESCE_MS * args.samplerate / 1000.0 / args.blocksize)))
+    sox_q = queue.Queue(maxsize=LIVE_SOX_QUEUE)
+    sox_pool = {"buf": np.empty((LIVE_SOX_QUEUE + sox_batch, args.blocksize), dtype=np.float32), "w": 0}
+
+    def sox_writer():
+        fd = sox_proc.stdin.fileno()
+        while True:
+            views, done = [], False
+            while len(views) < sox_batch:
+                block = sox_q.get()
+                if block is None:
+                    done = True; break
+                # Tonhöhe hier statt im Callback: der Vocoder rechnet FFTs je Hop
+                if shifter is not None: shifter.process(block, out=block)
+                views.append(memoryview(block).cast("B"))
+            try:
+                while views:
+                    n = os.writev(fd, views)
+                    while views and n >= len(views[0]):
+                        n -= len(views.pop(0))
+                    if n: views[0] = views[0][n:]
+            except (BrokenPipeError, OSError):
+                sox_state["failed"] = True
+                print("SoX pipe broken, audio output stopped", file=sys.stderr)
+                return
+            if done: return
+
+    def sox_put(block):
+        # voll -> Block verwerfen statt warten (der älteste wird gerade geschrieben)
+        if sox_q.full(): return
+        pool = sox_pool["buf"]
+        if block.shape[0] != pool.shape[1]:
+            pool = sox_pool["buf"] = np.empty((pool.shape[0], block.shape[0]), dtype=np.float32)
+        slot = pool[sox_pool["w"] % pool.shape[0]]
+        np.copyto(slot, block)
+        sox_pool["w"] += 1
+        sox_q.put_nowait(slot)
+
+    sox_thread = None
+    if sox_proc is not None and sox_proc.stdin:
+        sox_thread = threading.Thread(target=sox_writer, daemon=True)
+        sox_thread.start()
+
+    # RMS ohne temporäres Quadrat-Array: numpy-rms (AVX/NEON) oder Skalarprodukt
+    if HAVE_NUMPY_RMS:
+        def block_rms(m):
+            return float(numpy_rms.rms(m, window_size=m.shape[0])[0])
+    else:
+        def block_rms(m):
+            return float(np.sqrt(np.dot(m, m) / m.shape[0] + 1e-20))
+
     def process_block(mono_block):
         nonlocal y
-        rms = float(np.sqrt(np.mean(mono_block * mono_block) + 1e-20))
-        hist.append(rms)
-        level_db = 20.0 * np.log10(max(rms, 1e-12))
-        if level_db < SILENCE_GATE_DBFS:
-            x = 0.0
-        else:
-            arr = np.array(hist, dtype=np.float64)
-            ref = float(np.percentile(arr[arr>0], NORM_PERCENTILE)) if np.any(arr>0) else 1.0
-            if ref <= 0: ref = 1.0
-            x = max(0.0, min(1.0, rms/ref))
-        y = atk_a*y + (1.0-atk_a)*x if x>y else rel_a*y + (1.0-rel_a)*x
-        angle = float(args.closed_angle) + (float(args.open_angle) - float(args.closed_angle)) * y
-        set_angle(angle)
-
-    def callback(indata, outdata, frames, time_info, status):
-        nonlocal sox_proc_failed
-        if status: print(status, file=sys.stderr)
-        block = indata
-        mono = block.mean(axis=1).astype(np.float32) if block.ndim > 1 else block.astype(np.float32)
-        mono = np.clip(mono * in_gain, -1.0, 1.0)
+        rms = block_rms(mono_block)
+        hist_push(rms)
+        n = len(hist_sorted)
+        ref = hist_sorted[int(NORM_PERCENTILE / 100.0 * (n - 1))] if n else 1.0
+        y, pw = env_step(rms, ref, y, atk_a, rel_a, gate, pw_closed, pw_open)
+        set_pulse(pw)
+
+    rt_prio = {"done": False}
+    def raise_rt_priority():
+        # Beim ersten Callback den PortAudio-Thread auf SCHED_FIFO setzen,
+        # sonst verdrängen ihn Flask/pigpio und es gibt Aussetzer (xruns).
+        # Braucht CAP_SYS_NICE (siehe README).
+        rt_prio["done"] = True
+        try:
+            os.sched_setscheduler(threading.get_native_id(), os.SCHED_FIFO, os.sched_param(LIVE_RT_PRIORITY))
+            print(f"Audio-Thread: SCHED_FIFO {LIVE_RT_PRIORITY}")
+        except (AttributeError, OSError) as e:
+            print(f"Hinweis: keine Echtzeit-Priorität für den Audio-Thread ({e})", file=sys.stderr)
 
-        if args.mode == "fx":
-            if not sox_proc_failed and sox_proc is not None and sox_proc.stdin:
-                try:
-                    sox_proc.stdin.write(mono.tobytes(order="C"))
-                except BrokenPipeError:
-                    sox_proc_failed = True
-                    print("SoX pipe broken, audio output stopped", file=sys.stderr)
-        else:
-            # Direkte Ausgabe über PortAudio
-            if outdata is not None:
-                out_buf = np.clip(mono * out_gain, -1.0, 1.0)
-                if outdata.ndim == 1: outdata[:] = out_buf
-                else:
-                    outdata[:,0] = out_buf
-                    if outdata.shape[1] > 1: outdata[:,1] = out_buf
-
-        # Servo-Delay (nur sinnvoll bei FX)
-        if args.mode == "fx" and delay_blocks > 0:
-            q_delay.append(mono)
-            if len(q_delay) == q_delay.maxlen:
-                process_block(q_delay[0])
-        else:
-            process_block(mono)
+    # feste Puffer für den Callback: keine Allokation im Echtzeit-Thread
+    bufs = {"mono": np.empty(args.blocksize, dtype=np.float32),
+            "out":  np.empty(args.blocksize, dtype=np.float32)}
+
+    def read_input(indata, frames, status):
+        if not rt_prio["done"]: raise_rt_priority()
+        if status: print(status, file=sys.stderr)
+        if frames != len(bufs["mono"]):   # PortAudio darf abweichende Blockgrößen liefern
+            bufs["mono"] = np.empty(frames, dtype=np.float32); bufs["out"] = np.empty(frames, dtype=np.float32)
+        mono = bufs["mono"]
+        # der Eingang ist immer mono geöffnet: (N, 1) als flache Ansicht lesen,
+        # Verstärkung schreibt direkt nach mono (kein Mittelwert über Kanäle)
+        gain_clip(indata.reshape(-1), mono, in_gain)
+        return mono
+
+    # je Modus ein eigener Callback, damit im Echtzeit-Pfad keine
+    # Modus-/Delay-Abfragen stehen; die Auswahl fällt beim Öffnen des Streams
+    def callback_normal(indata, outdata, frames, time_info, status):
+        mono = read_input(indata, frames, status)
+        # Direkte Ausgabe über PortAudio
+        out_buf = bufs["out"]
+        gain_clip(mono, out_buf, out_gain)
+        # ein Broadcast-Store in alle Kanäle statt einer Zuweisung je Spalte
+        np.copyto(outdata, out_buf if outdata.ndim == 1 else out_buf[:, None])
+        process_block(mono)
+
+    def fx_output(mono):
+        if not sox_state["failed"]:
+            sox_put(mono)
+
+    def callback_fx(indata, frames, time_info, status):
+        mono = read_input(indata, frames, status)
+        fx_output(mono)
+        process_block(mono)
+
+    def callback_fx_delayed(indata, frames, time_info, status):
+        # Servo-Delay: Block in den Ring, den ältesten auswerten
+        mono = read_input(indata, frames, status)
+        fx_output(mono)
+        ring = delay["ring"]
+        if frames != ring.shape[1]:
+            ring = delay["ring"] = np.empty((ring.shape[0], frames), dtype=np.float32); delay["filled"] = 0
+        i = delay["idx"]
+        np.copyto(ring[i], mono)
+        delay["idx"] = (i + 1) % ring.shape[0]
+        if delay["filled"] < ring.shape[0]: delay["filled"] += 1
+        if delay["filled"] == ring.shape[0]:
+            process_block(ring[delay["idx"]])   # ältester Block = nächster Schreibplatz
+
+    def low_latency(dev, kind):
+        # Geräte-Minimum statt PortAudio-Standard ("high") verwenden
+        try:
+            return float(sd.query_devices(dev, kind)[f"default_low_{kind}_latency"])
+        except Exception:
+            return "low"
 
-    latency_kw = {"latency": "low"} if args.ultra_low_latency else {}
     try:
-        in_channels = 1
         if args.input_device is not None:
             try:
                 info_in = sd.query_devices(args.input_device)
@@ -3051,10 +4759,14 @@ def live_main(argv):
             except Exception as e:
                 print(f"Warnung: Eingabegerät #{args.input_device} konnte nicht abgefragt werden ({e}). Nutze Mono (1 Kanal).", file=sys.stderr)
 
+        latency_kw = {}
+        if args.ultra_low_latency:
+            latency_kw["latency"] = low_latency(args.input_device, "input")
+
         if args.mode == "fx":
             stream = sd.InputStream(samplerate=args.samplerate, blocksize=args.blocksize, dtype="float32",
-                                    channels=in_channels, device=args.input_device,
-                                    callback=lambda indata, frames, time_info, status: callback(indata, None, frames, time_info, status),
+                                    channels=1, device=args.input_device,
+                                    callback=callback_fx_delayed if delay is not None else callback_fx,
                                     **latency_kw)
         else:
             out_channels = 1
@@ -3068,11 +4780,17 @@ def live_main(argv):
                     out_channels = 2 if max_out >= 2 else 1
                 except Exception as e:
                     print(f"Warnung: Ausgabegerät #{args.output_device} konnte nicht abgefragt werden ({e}). Nutze Mono (1 Kanal).", file=sys.stderr)
+            if args.ultra_low_latency:
+                latency_kw["latency"] = (latency_kw["latency"], low_latency(args.output_device, "output"))
             stream = sd.Stream(samplerate=args.samplerate, blocksize=args.blocksize, dtype="float32",
-                               channels=(in_channels, out_channels), device=(args.input_device, args.output_device),
-                               callback=callback, **latency_kw)
+                               channels=(1, out_channels), device=(args.input_device, args.output_device),
+                               callback=callback_normal, **latency_kw)
+        lat = stream.latency if isinstance(stream.latency, (tuple, list)) else (stream.latency,)
+        print(f"Latenz: {' / '.join(f'{1000.0*l:.1f}' for l in lat)} ms, Blockgröße {args.blocksize}")
         print(f"Live gestartet (Modus {args.mode}). Strg+C zum Beenden.")
         with stream:
+            # erst nach dem Start: dann existieren Puffer und PortAudio-Thread schon
+            if LIVE_MLOCK: lock_live_memory()
             try:
                 signal.pause()
             except AttributeError:
@@ -3084,6 +4802,10 @@ def live_main(argv):
         sys.exit(10)
     finally:
         try:
+            if sox_thread is not None:
+                try: sox_q.put(None, timeout=0.2)   # Restblöcke noch ausgeben
+                except queue.Full: pass
+                sox_thread.join(timeout=0.5)
             if sox_proc is not None:
                 try:
                     if sox_proc.stdin: sox_proc.stdin.close()
@@ -3104,6 +4826,16 @@ if __name__ == "__main__":
 
     ensure_dirs()
     load_config()
+    load_meta_cache()
+    atexit.register(save_meta_cache)
+    atexit.register(close_mpg123_remote)
+    def _on_sigterm(signum, frame):
+        sys.exit(0)   # atexit speichert den Metadaten-Cache
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    start_mp3_watch()
+    prewarm_envelopes()
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: invalidate_mp3_index())
     for k, v in DEFAULT_CONFIG.items():
         if k not in cfg:
             cfg[k] = v
@@ -3127,4 +4859,8 @@ if __name__ == "__main__":
             pi = None
 
     print(f"Soundboard läuft auf http://{HOST}:{PORT}")
-    app.run(host=HOST, port=PORT, debug=False)
+    if HAVE_WAITRESS:
+        # je offener Live-Seite hält /live-events einen Thread belegt
+        waitress_serve(app, host=HOST, port=PORT, threads=8)
+    else:
+        app.run(host=HOST, port=PORT, debug=False, threaded=True)